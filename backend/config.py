@@ -1,7 +1,124 @@
-# Roles are now defined in roles.py
-
 # AI Configuration
 import os
+import json
 OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
 OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "llama3")
 
+
+# Batch Screening
+# Each pipeline stage gets its own limit so a saturated LLM never starves parsing.
+BATCH_PARSE_CONCURRENCY = int(os.getenv("BATCH_PARSE_CONCURRENCY", "4"))
+BATCH_SCORE_CONCURRENCY = int(os.getenv("BATCH_SCORE_CONCURRENCY", "8"))
+BATCH_LLM_CONCURRENCY = int(os.getenv("BATCH_LLM_CONCURRENCY", "2"))
+BATCH_MAX_FILES = int(os.getenv("BATCH_MAX_FILES", "500"))
+
+# Ollama Client
+# Max concurrent generations; match the model server's slot count (OLLAMA_NUM_PARALLEL).
+OLLAMA_MAX_CONCURRENCY = int(os.getenv("OLLAMA_MAX_CONCURRENCY", "2"))
+OLLAMA_TIMEOUT = float(os.getenv("OLLAMA_TIMEOUT", "180"))
+
+# LLM Routing
+# Comma-separated model servers; prefix OpenAI-compatible ones with "openai=", e.g.
+# "http://box1:11434,http://box2:11434,openai=http://box3:8000". Defaults to OLLAMA_BASE_URL.
+LLM_BACKENDS = os.getenv("LLM_BACKENDS", OLLAMA_BASE_URL)
+# Smaller/faster model used when the least loaded server would queue longer than LLM_FALLBACK_QUEUE_SECONDS
+LLM_FALLBACK_MODEL = os.getenv("LLM_FALLBACK_MODEL", "")
+LLM_FALLBACK_QUEUE_SECONDS = float(os.getenv("LLM_FALLBACK_QUEUE_SECONDS", "30"))
+# Generation slots per server reserved for the fallback model (separate from OLLAMA_MAX_CONCURRENCY)
+LLM_FALLBACK_CONCURRENCY = int(os.getenv("LLM_FALLBACK_CONCURRENCY", "1"))
+# Per-role model as JSON, keyed by role id or title: '{"data_scientist": "llama3:70b"}'
+LLM_ROLE_MODELS = json.loads(os.getenv("LLM_ROLE_MODELS", "{}"))
+LLM_BREAKER_THRESHOLD = int(os.getenv("LLM_BREAKER_THRESHOLD", "3"))
+LLM_BREAKER_RESET = float(os.getenv("LLM_BREAKER_RESET", "30"))
+
+# Structured Output
+# Follow-up prompts asking only for fields missing from a malformed answer, capped by a per-request budget
+LLM_REPAIR_MAX_RETRIES = int(os.getenv("LLM_REPAIR_MAX_RETRIES", "1"))
+LLM_REPAIR_BUDGET_SECONDS = float(os.getenv("LLM_REPAIR_BUDGET_SECONDS", "60"))  # from the start of the first call
+
+# Fast Scoring
+# Interactive /analyze falls back to the deterministic score estimate after this many seconds (0 = wait for the LLM).
+# Defaults to OLLAMA_TIMEOUT, so out of the box only a failed LLM call is replaced by the estimate.
+LLM_FAST_FALLBACK_SECONDS = float(os.getenv("LLM_FAST_FALLBACK_SECONDS", str(OLLAMA_TIMEOUT)))
+# (feature prior, LLM score) pairs used to calibrate the estimate onto the LLM's scale
+CALIBRATION_DB_PATH = os.getenv("CALIBRATION_DB_PATH", os.path.join("data", "calibration.sqlite3"))
+
+# Hybrid Scoring
+# Final score = SCORE_AI_SHARE * AI score + the rest * role-weighted section score
+SCORE_AI_SHARE = float(os.getenv("SCORE_AI_SHARE", "0.6"))
+# Each section score blends the LLM's section_scores with the deterministic feature by this share
+SCORE_LLM_SECTION_SHARE = float(os.getenv("SCORE_LLM_SECTION_SHARE", "0.5"))
+
+# Caching
+CACHE_DIR = os.getenv("CACHE_DIR", "cache")
+ANALYSIS_CACHE_ENABLED = os.getenv("ANALYSIS_CACHE_ENABLED", "true").lower() == "true"
+ANALYSIS_CACHE_SIZE = int(os.getenv("ANALYSIS_CACHE_SIZE", "512"))  # in-memory entries
+ANALYSIS_CACHE_TTL = float(os.getenv("ANALYSIS_CACHE_TTL", str(7 * 24 * 3600)))  # seconds
+ANALYSIS_CACHE_DISK_MAX_ENTRIES = int(os.getenv("ANALYSIS_CACHE_DISK_MAX_ENTRIES", "50000"))
+PARSE_CACHE_ENABLED = os.getenv("PARSE_CACHE_ENABLED", "true").lower() == "true"
+PARSE_CACHE_MAX_BYTES = int(os.getenv("PARSE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))  # extracted text held in memory
+PARSE_CACHE_SPILL_TO_DISK = os.getenv("PARSE_CACHE_SPILL_TO_DISK", "false").lower() == "true"
+PARSE_CACHE_DISK_MAX_ENTRIES = int(os.getenv("PARSE_CACHE_DISK_MAX_ENTRIES", "20000"))
+
+# Background Jobs (opt-in with /analyze?mode=async)
+JOBS_DB_PATH = os.getenv("JOBS_DB_PATH", os.path.join("data", "jobs.sqlite3"))
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+JOB_RETRY_BASE_DELAY = float(os.getenv("JOB_RETRY_BASE_DELAY", "2.0"))  # seconds, doubles per attempt
+# Finished (succeeded/failed) jobs are deleted this long after their last update
+JOB_RETENTION_DAYS = float(os.getenv("JOB_RETENTION_DAYS", "7"))
+JOB_GC_INTERVAL = float(os.getenv("JOB_GC_INTERVAL", "600"))  # seconds
+
+# Reports
+REPORTS_DIR = os.getenv("REPORTS_DIR", "reports")
+# "lazy": render the PDF on first download; "background": render right after analysis off the request path
+REPORT_RENDER_MODE = os.getenv("REPORT_RENDER_MODE", "lazy")
+REPORT_MAX_AGE_DAYS = float(os.getenv("REPORT_MAX_AGE_DAYS", "30"))
+REPORT_MAX_TOTAL_MB = float(os.getenv("REPORT_MAX_TOTAL_MB", "1024"))
+REPORT_GC_INTERVAL = float(os.getenv("REPORT_GC_INTERVAL", "600"))  # seconds
+
+# Uploads
+MAX_UPLOAD_MB = float(os.getenv("MAX_UPLOAD_MB", "25"))
+BATCH_MAX_UPLOAD_MB = float(os.getenv("BATCH_MAX_UPLOAD_MB", "500"))
+# Cap on the declared uncompressed size of all .zip members in one batch (zip-bomb guard)
+BATCH_MAX_UNCOMPRESSED_MB = float(os.getenv("BATCH_MAX_UNCOMPRESSED_MB", "1024"))
+# Uploaded files above this size are spooled to a temp file instead of memory
+UPLOAD_SPOOL_THRESHOLD_KB = int(os.getenv("UPLOAD_SPOOL_THRESHOLD_KB", "1024"))
+
+# Local Extraction (pypdf/docx2txt fallback when Tika is down)
+LOCAL_PARSE_WORKERS = int(os.getenv("LOCAL_PARSE_WORKERS", str(os.cpu_count() or 2)))  # 0 = run inline
+LOCAL_PARSE_TIMEOUT = float(os.getenv("LOCAL_PARSE_TIMEOUT", "30"))  # seconds per document
+MAX_PDF_PAGES = int(os.getenv("MAX_PDF_PAGES", "50"))
+PDF_PAGES_PER_TASK = int(os.getenv("PDF_PAGES_PER_TASK", "10"))
+
+# Tika
+# Comma-separated list of Tika endpoints; requests are round-robined across healthy ones
+TIKA_URLS = [u.strip() for u in os.getenv("TIKA_URLS", "http://localhost:9998/tika").split(",") if u.strip()]
+TIKA_TIMEOUT = float(os.getenv("TIKA_TIMEOUT", "5"))
+TIKA_BREAKER_THRESHOLD = int(os.getenv("TIKA_BREAKER_THRESHOLD", "3"))  # consecutive failures before skipping Tika
+TIKA_BREAKER_RESET = float(os.getenv("TIKA_BREAKER_RESET", "30"))  # seconds before retrying an open endpoint
+HEALTH_PROBE_INTERVAL = float(os.getenv("HEALTH_PROBE_INTERVAL", "15"))
+
+# Role Catalog
+# JSON (or YAML with PyYAML) file of role id -> {title, keywords, description, weights}
+ROLES_PATH = os.getenv("ROLES_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "roles.json"))
+ROLES_RELOAD_INTERVAL = float(os.getenv("ROLES_RELOAD_INTERVAL", "5"))  # seconds between file checks; 0 = no hot reload
+
+# Semantic Role Matching
+SEMANTIC_MODEL = os.getenv("SEMANTIC_MODEL", "")  # local sentence-transformers model; empty = hashing TF-IDF
+SEMANTIC_DIM = int(os.getenv("SEMANTIC_DIM", "4096"))
+SEMANTIC_MATRIX_PATH = os.getenv("SEMANTIC_MATRIX_PATH", "")  # precomputed .npz from `python -m backend.services.semantic_matcher`
+
+# Candidate Search Index (role -> candidates)
+CANDIDATE_INDEX_ENABLED = os.getenv("CANDIDATE_INDEX_ENABLED", "true").lower() == "true"
+CANDIDATE_DB_PATH = os.getenv("CANDIDATE_DB_PATH", os.path.join("data", "candidates.sqlite3"))
+
+# Observability
+# Adds a Server-Timing header with per-stage durations to every response (also switchable at runtime)
+SERVER_TIMING_ENABLED = os.getenv("SERVER_TIMING_ENABLED", "false").lower() == "true"
+# Exposes /debug/* (sampling profiler, Server-Timing toggle); keep off in production
+DEBUG_ENDPOINTS_ENABLED = os.getenv("DEBUG_ENDPOINTS_ENABLED", "false").lower() == "true"
+
+# Prompt Size
+# Resumes are compacted (whitespace, duplicate lines, low-priority sections) to fit this many tokens; 0 disables
+PROMPT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", "1500"))
@@ -1,16 +1,59 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Request
+from fastapi.responses import StreamingResponse, JSONResponse, FileResponse, PlainTextResponse, Response
+from fastapi.concurrency import run_in_threadpool
+from typing import List, Optional
 from fastapi.middleware.cors import CORSMiddleware
 import shutil
 import os
 import logging
+import json
+import asyncio
 from backend.services.parser import TikaParser
+from backend.services.extraction import LocalExtractor
+from backend.services.health import HealthProber, CircuitBreaker
+from backend.services.semantic_matcher import SemanticRoleMatcher, make_embedder
 from backend.services.llm import OllamaService
-from backend.roles import ROLES
-from backend.models import ResumeUploadResponse, AnalysisRequest, AnalysisResponse
-from backend.services.keyword_scoring import keyword_density_score
-from backend.services.score_normalizer import formatting_score, normalize_ats_score
-from backend.services.report_generator import generate_ats_report
-import uuid
+from backend.services.llm_router import LLMBackend, LLMRouter, NoBackendAvailable, parse_backends
+from backend.services.json_stream import IncrementalJSONObjectParser
+from backend.roles import ROLES, ROLE_CATALOG
+from backend.models import (
+    ResumeUploadResponse, AnalysisRequest, AnalysisResponse, ReportExportRequest, RoleMatch, RoleMatchRequest,
+    JobDescriptionRequest, RoleScore, RoleScoreBatchRequest, MultiRoleAnalysisRequest, MultiRoleAnalysisResponse,
+    RoleNarrative, RoleNarrativeRequest
+)
+from backend.services.analysis import (
+    deterministic_scores, deterministic_features, build_analysis, index_candidate, llm_or_estimate,
+    estimated_llm_result, fill_missing_score
+)
+from backend.services.estimator import ScoreEstimator
+from backend.services.scoring_engine import ScoringEngine
+from backend.services.llm_output import parse_analysis
+from backend.services.candidate_index import CandidateIndex, candidate_id_for
+from backend.services.jd_analyzer import JobDescriptionAnalyzer, jd_id_for
+from backend.services.batch import BatchPipeline, expand_uploads
+from backend.services.cache import LRUCache, SQLiteCache, TieredCache
+from backend.services.jobs import JobStore, JobQueue, is_transient
+from backend.services.report_store import ReportStore
+from backend.services.uploads import UploadLimitMiddleware
+from backend.services.metrics import (
+    REGISTRY, PROFILER, UPSTREAM_ERRORS, SCORE_ESTIMATES, MetricsMiddleware, CallbackMetric, stage
+)
+from starlette.formparsers import MultiPartParser
+from backend.config import (
+    CACHE_DIR, ANALYSIS_CACHE_ENABLED, ANALYSIS_CACHE_SIZE, ANALYSIS_CACHE_TTL, ANALYSIS_CACHE_DISK_MAX_ENTRIES,
+    PARSE_CACHE_ENABLED, PARSE_CACHE_MAX_BYTES, PARSE_CACHE_SPILL_TO_DISK, PARSE_CACHE_DISK_MAX_ENTRIES,
+    JOBS_DB_PATH, JOB_WORKERS, JOB_MAX_ATTEMPTS, JOB_RETRY_BASE_DELAY, JOB_RETENTION_DAYS, JOB_GC_INTERVAL,
+    REPORTS_DIR, REPORT_RENDER_MODE, REPORT_MAX_AGE_DAYS, REPORT_MAX_TOTAL_MB, REPORT_GC_INTERVAL,
+    MAX_UPLOAD_MB, BATCH_MAX_UPLOAD_MB, UPLOAD_SPOOL_THRESHOLD_KB,
+    LOCAL_PARSE_WORKERS, LOCAL_PARSE_TIMEOUT, MAX_PDF_PAGES, PDF_PAGES_PER_TASK,
+    TIKA_URLS, TIKA_TIMEOUT, TIKA_BREAKER_THRESHOLD, TIKA_BREAKER_RESET, HEALTH_PROBE_INTERVAL,
+    SEMANTIC_MODEL, SEMANTIC_DIM, SEMANTIC_MATRIX_PATH,
+    CANDIDATE_INDEX_ENABLED, CANDIDATE_DB_PATH,
+    OLLAMA_MODEL, OLLAMA_MAX_CONCURRENCY, LLM_BACKENDS, LLM_FALLBACK_MODEL, LLM_FALLBACK_QUEUE_SECONDS,
+    LLM_FALLBACK_CONCURRENCY, LLM_ROLE_MODELS, LLM_BREAKER_THRESHOLD, LLM_BREAKER_RESET,
+    LLM_FAST_FALLBACK_SECONDS, CALIBRATION_DB_PATH,
+    SERVER_TIMING_ENABLED, DEBUG_ENDPOINTS_ENABLED, BATCH_MAX_FILES
+)
 
 
 # Configure Logging
@@ -19,10 +62,18 @@ logger = logging.getLogger(__name__)
 
 app = FastAPI(title="ATS Scanner Backend")
 
-from fastapi.staticfiles import StaticFiles
-
 # ...
 
+# Reject oversized uploads before the multipart body is parsed. Added before CORS so that
+# CORS wraps it: a browser must be able to read the 413.
+app.add_middleware(
+    UploadLimitMiddleware,
+    limits={
+        "/upload": int(MAX_UPLOAD_MB * 1024 * 1024),
+        "/batch/analyze": int(BATCH_MAX_UPLOAD_MB * 1024 * 1024),
+    }
+)
+
 # CORS (Allow frontend)
 app.add_middleware(
     CORSMiddleware,
@@ -32,13 +83,128 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Serve Reports
-os.makedirs("reports", exist_ok=True)
-app.mount("/reports", StaticFiles(directory="reports"), name="reports")
+MultiPartParser.spool_max_size = UPLOAD_SPOOL_THRESHOLD_KB * 1024
+
+# Request latency histograms + optional Server-Timing header (toggle at runtime via /debug/server-timing)
+metrics_settings = {"server_timing": SERVER_TIMING_ENABLED}
+app.add_middleware(MetricsMiddleware, settings=metrics_settings)
+
+# Reports are rendered on demand by /reports/{id}.pdf
+report_store = ReportStore(
+    REPORTS_DIR, eager=REPORT_RENDER_MODE == "background",
+    max_age=REPORT_MAX_AGE_DAYS * 24 * 3600, max_bytes=int(REPORT_MAX_TOTAL_MB * 1024 * 1024)
+)
 
 # Initialize Services
-tika_parser = TikaParser()
-ollama_service = OllamaService()
+parse_cache = None
+if PARSE_CACHE_ENABLED:
+    parse_cache = TieredCache(
+        "parsed_documents",
+        LRUCache(max_entries=100_000, max_bytes=PARSE_CACHE_MAX_BYTES, sizeof=lambda doc: len(doc["text"])),
+        SQLiteCache(os.path.join(CACHE_DIR, "parsed.sqlite3"), max_entries=PARSE_CACHE_DISK_MAX_ENTRIES)
+        if PARSE_CACHE_SPILL_TO_DISK else None,
+        spill=True
+    )
+local_extractor = LocalExtractor(
+    workers=LOCAL_PARSE_WORKERS, timeout=LOCAL_PARSE_TIMEOUT,
+    max_pages=MAX_PDF_PAGES, pages_per_task=PDF_PAGES_PER_TASK
+)
+tika_parser = TikaParser(
+    TIKA_URLS, cache=parse_cache, extractor=local_extractor, timeout=TIKA_TIMEOUT,
+    breaker_threshold=TIKA_BREAKER_THRESHOLD, breaker_reset=TIKA_BREAKER_RESET
+)
+analysis_cache = None
+if ANALYSIS_CACHE_ENABLED:
+    analysis_cache = TieredCache(
+        "analysis",
+        LRUCache(max_entries=ANALYSIS_CACHE_SIZE, ttl=ANALYSIS_CACHE_TTL),
+        SQLiteCache(os.path.join(CACHE_DIR, "analysis.sqlite3"), ttl=ANALYSIS_CACHE_TTL,
+                    max_entries=ANALYSIS_CACHE_DISK_MAX_ENTRIES)
+    )
+def role_models_by_title(catalog) -> dict:
+    # Role ids are accepted as keys and mapped onto the titles role configs carry
+    return {catalog.roles[k]["title"] if k in catalog.roles else k: v for k, v in LLM_ROLE_MODELS.items()}
+
+llm_router = LLMRouter(
+    [
+        LLMBackend(url, kind, OLLAMA_MAX_CONCURRENCY, CircuitBreaker(LLM_BREAKER_THRESHOLD, LLM_BREAKER_RESET),
+                   fallback_concurrency=LLM_FALLBACK_CONCURRENCY)
+        for kind, url in parse_backends(LLM_BACKENDS)
+    ],
+    OLLAMA_MODEL,
+    fallback_model=LLM_FALLBACK_MODEL,
+    fallback_wait=LLM_FALLBACK_QUEUE_SECONDS,
+    role_models=role_models_by_title(ROLE_CATALOG.current)
+)
+ollama_service = OllamaService(cache=analysis_cache, router=llm_router)
+# Role-independent resume profiles from /analyze/multi, keyed by candidate id, for lazy role narratives
+profile_store = TieredCache(
+    "profiles", LRUCache(max_entries=1024), SQLiteCache(os.path.join(CACHE_DIR, "profiles.sqlite3"))
+)
+score_estimator = ScoreEstimator(CALIBRATION_DB_PATH)
+scoring_engine = ScoringEngine(ROLE_CATALOG.current, score_estimator)
+def load_role_matcher() -> SemanticRoleMatcher:
+    catalog = ROLE_CATALOG.current
+    if SEMANTIC_MATRIX_PATH and os.path.exists(SEMANTIC_MATRIX_PATH):
+        matcher = SemanticRoleMatcher.load(SEMANTIC_MATRIX_PATH, SEMANTIC_MODEL or None)
+        # Same role ids are not enough: edited keywords/descriptions change the role vectors
+        if matcher.catalog_version == catalog.version:
+            return matcher
+        logger.warning(
+            f"Precomputed role matrix is for catalog {matcher.catalog_version}, not {catalog.version}; rebuilding"
+        )
+    return SemanticRoleMatcher.from_roles(catalog.roles, make_embedder(SEMANTIC_MODEL, SEMANTIC_DIM), catalog.version)
+
+role_matcher = load_role_matcher()
+jd_analyzer = JobDescriptionAnalyzer(
+    ROLE_CATALOG.current,
+    TieredCache("job_descriptions", LRUCache(max_entries=256), SQLiteCache(os.path.join(CACHE_DIR, "job_descriptions.sqlite3")))
+)
+candidate_index = CandidateIndex(CANDIDATE_DB_PATH, ROLE_CATALOG.current.index) if CANDIDATE_INDEX_ENABLED else None
+
+def on_roles_reloaded(catalog):
+    """Rebuilds everything derived from the role catalog (runs on the reload thread)."""
+    global role_matcher, scoring_engine
+    role_matcher = SemanticRoleMatcher.from_roles(
+        catalog.roles, make_embedder(SEMANTIC_MODEL, SEMANTIC_DIM), catalog.version
+    )
+    scoring_engine = ScoringEngine(catalog, score_estimator)
+    jd_analyzer.catalog = catalog
+    llm_router.role_models = role_models_by_title(catalog)
+    if candidate_index is not None:
+        candidate_index.reindex(catalog.index)
+
+ROLE_CATALOG.subscribe(on_roles_reloaded)
+batch_pipeline = BatchPipeline(tika_parser, ollama_service, report_store, candidate_index, score_estimator)
+health_prober = HealthProber(interval=HEALTH_PROBE_INTERVAL)
+health_prober.register("tika", tika_parser.probe)
+health_prober.register("ollama", ollama_service.probe)
+job_queue = JobQueue(
+    JobStore(JOBS_DB_PATH), workers=JOB_WORKERS,
+    max_attempts=JOB_MAX_ATTEMPTS, retry_base_delay=JOB_RETRY_BASE_DELAY,
+    # Only an unreachable/overloaded LLM is worth another attempt; a bad role or payload fails at once
+    retryable=lambda e: is_transient(e) or isinstance(e, NoBackendAvailable)
+)
+
+# Scrape-time views of state the services already keep
+caches = {"analysis": analysis_cache, "parsed_documents": parse_cache, "profiles": profile_store}
+def cache_stat(field: str):
+    return lambda: {name: cache.stats()[field] for name, cache in caches.items() if cache is not None}
+REGISTRY.register(CallbackMetric("ats_cache_hits_total", "Cache hits.", cache_stat("hits"), "cache", kind="counter"))
+REGISTRY.register(CallbackMetric("ats_cache_misses_total", "Cache misses.", cache_stat("misses"), "cache", kind="counter"))
+REGISTRY.register(CallbackMetric("ats_cache_memory_entries", "Entries held in memory.", cache_stat("memory_entries"), "cache"))
+REGISTRY.register(CallbackMetric("ats_job_queue_depth", "Jobs waiting for a worker.", job_queue.depth))
+REGISTRY.register(CallbackMetric(
+    "ats_llm_outstanding_requests", "Queued + running generations per LLM backend.",
+    lambda: {b.url: b.outstanding for b in llm_router.backends}, "backend"
+))
+REGISTRY.register(CallbackMetric(
+    "ats_llm_fallback_model_total", "Calls sent to the fallback model.", lambda: llm_router.fallbacks, kind="counter"
+))
+REGISTRY.register(CallbackMetric(
+    "ats_upstream_up", "1 if the last health probe succeeded.",
+    lambda: {name: int(r["status"] == "online") for name, r in health_prober.snapshot().items()}, "upstream"
+))
 
 @app.get("/")
 def read_root():
@@ -50,176 +216,478 @@ def health_check():
 
 @app.get("/status")
 def system_status():
-    """Checks availability of external services"""
-    status = {
-        "tika": "unknown",
-        "ollama": "unknown"
+    """Availability of external services, as last seen by the background health prober (no live I/O)."""
+    results = health_prober.snapshot()
+    return {
+        "tika": results["tika"]["status"],
+        "ollama": results["ollama"]["status"],
+        "details": results,
+        "roles": ROLE_CATALOG.snapshot()
     }
-    
-    # Check Tika
-    try:
-        tika_parser.parse_resume(b"") # specific check or just ping
-        # Tika usually needs a valid file to return 200 on put, so let's just assume it's up if we handled the error in the class
-        # Ideally we ping a version endpoint
-        import requests
-        requests.get("http://localhost:9998/tika", timeout=2)
-        status["tika"] = "online"
-    except Exception:
-        status["tika"] = "offline/unavailable"
-
-    # Check Ollama
+
+@app.get("/llm/stats")
+def llm_stats():
+    """Prompt compaction counters, per-backend routing state and score-estimate calibration."""
+    return {**ollama_service.stats(), "estimator": score_estimator.stats()}
+
+@app.get("/metrics")
+def metrics():
+    """Prometheus text exposition: stage/request latency histograms, cache, queue and upstream counters."""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+def require_debug():
+    if not DEBUG_ENDPOINTS_ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
+
+@app.post("/debug/server-timing")
+def toggle_server_timing(enabled: bool = True):
+    require_debug()
+    metrics_settings["server_timing"] = enabled
+    return metrics_settings
+
+@app.post("/debug/profiler/start")
+def start_profiler(interval_ms: float = 10.0, duration: float = 60.0):
+    """Samples all thread stacks every interval_ms for up to `duration` seconds."""
+    require_debug()
     try:
-        import requests
-        requests.get("http://localhost:11434", timeout=2)
-        status["ollama"] = "online"
-    except Exception:
-        status["ollama"] = "offline/unavailable"
-        
-    return status
+        PROFILER.start(interval=interval_ms / 1000, duration=min(duration, 600.0))
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return PROFILER.status()
+
+@app.post("/debug/profiler/stop")
+def stop_profiler():
+    require_debug()
+    PROFILER.stop()
+    return PROFILER.status()
+
+@app.get("/debug/profiler")
+def profiler_report(limit: Optional[int] = None):
+    """Collapsed stacks (flamegraph.pl / speedscope input) of the last or current profiling run."""
+    require_debug()
+    return PlainTextResponse(PROFILER.report(limit))
+
+@app.get("/cache/stats")
+def cache_stats():
+    """Hit/miss counters for sizing the caches."""
+    return {
+        "analysis": analysis_cache.stats() if analysis_cache else None,
+        "parsed_documents": parse_cache.stats() if parse_cache else None
+    }
 
 @app.post("/upload", response_model=ResumeUploadResponse)
 async def upload_resume(file: UploadFile = File(...)):
     try:
-        content = await file.read()
-        extracted_text = tika_parser.parse_resume(content, file.filename)
+        # The multipart parser has already spooled the file (to disk above
+        # UPLOAD_SPOOL_THRESHOLD_KB); hand the file object on instead of reading it into memory.
+        # Parsing blocks (Tika I/O or the process-pool fallback), so keep it off the event loop
+        with stage("parse"):
+            extracted_text = await run_in_threadpool(tika_parser.parse_resume, file.file, file.filename or "resume")
         
-        # Auto-detect role
+        # Auto-detect role (semantic similarity breaks keyword-count ties).
+        # One embedding, off the event loop, feeds both the tie-breaker and the top matches.
         from backend.services.role_detector import detect_role
-        best_role_id, confidence = detect_role(extracted_text)
+        matcher = role_matcher
+        with stage("semantic_match"):
+            scores = await run_in_threadpool(matcher.scores, extracted_text)
+        semantic_scores = matcher.score_map(scores=scores)
+        with stage("detect_role"):
+            best_role_id, confidence = detect_role(extracted_text, tie_breaker=semantic_scores)
+        candidate_id = await run_in_threadpool(index_candidate, candidate_index, extracted_text, file.filename)
         
         return ResumeUploadResponse(
             filename=file.filename,
             extracted_text=extracted_text,
             status="success" if "Warning:" not in extracted_text else "partial_success",
-            detected_role=best_role_id
+            detected_role=best_role_id,
+            role_matches=matcher.rank(scores, 3),
+            candidate_id=candidate_id
         )
     except Exception as e:
         logger.error(f"Upload failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
-import json
+background_tasks = []
 
-def normalize_llm_response(data: dict) -> dict:
-    """Normalize LLM output to match our Pydantic schema exactly."""
-    
-    # Normalize skills: LLM might return ["Python", "Java"] but we need [{"name": "Python", "category": "Technical"}]
-    if "skills" in data:
-        normalized_skills = []
-        for skill in data.get("skills", []):
-            if isinstance(skill, str):
-                normalized_skills.append({"name": skill, "category": "Technical"})
-            elif isinstance(skill, dict) and "name" in skill:
-                if "category" not in skill:
-                    skill["category"] = "Technical"
-                normalized_skills.append(skill)
-        data["skills"] = normalized_skills
+async def report_gc_loop():
+    while True:
+        try:
+            await run_in_threadpool(report_store.gc)
+        except Exception as e:
+            logger.error(f"Report GC failed: {e}")
+        await asyncio.sleep(REPORT_GC_INTERVAL)
+
+async def job_gc_loop():
+    while True:
+        try:
+            purged = await run_in_threadpool(job_queue.store.purge, JOB_RETENTION_DAYS * 86400)
+            if purged:
+                logger.info(f"Job GC removed {purged} finished job(s)")
+        except Exception as e:
+            logger.error(f"Job GC failed: {e}")
+        await asyncio.sleep(JOB_GC_INTERVAL)
+
+@app.on_event("startup")
+async def start_workers():
+    await job_queue.start()
+    background_tasks.append(asyncio.create_task(report_gc_loop()))
+    background_tasks.append(asyncio.create_task(job_gc_loop()))
+    background_tasks.append(asyncio.create_task(health_prober.run()))
+    background_tasks.append(asyncio.create_task(ROLE_CATALOG.run()))
+
+@app.on_event("shutdown")
+async def shutdown_clients():
+    for task in background_tasks:
+        task.cancel()
+    await job_queue.stop()
+    local_extractor.shutdown()
+    await ollama_service.aclose()
+
+async def run_analysis(resume_text: str, role_config: dict, raise_llm_errors: bool = False,
+                       fast: bool = False) -> AnalysisResponse:
+    # 1. Deterministic Scoring
+    k_score, f_score, keyword_details = deterministic_scores(resume_text, role_config)
+    features = deterministic_features(resume_text, keyword_details, f_score)
     
-    # Normalize education: LLM might return [{"institution": "...", "years": [...]}] but we need ["BSc from XYZ"]
-    if "education" in data:
-        normalized_education = []
-        for edu in data.get("education", []):
-            if isinstance(edu, str):
-                normalized_education.append(edu)
-            elif isinstance(edu, dict):
-                # Convert dict to a readable string
-                inst = edu.get("institution", "Unknown")
-                degree = edu.get("degree", "")
-                years = edu.get("years", [])
-                year_str = f" ({years[0]}-{years[1]})" if len(years) == 2 else ""
-                normalized_education.append(f"{degree} from {inst}{year_str}".strip())
-        data["education"] = normalized_education
+    # 2. AI Analysis (estimated from deterministic features in fast mode or when the LLM is slow/down;
+    #    queued jobs raise instead so the queue retries)
+    raw_llm = await llm_or_estimate(
+        ollama_service, score_estimator, resume_text, role_config, keyword_details, f_score, fast=fast,
+        timeout=None if raise_llm_errors or not LLM_FAST_FALLBACK_SECONDS else LLM_FAST_FALLBACK_SECONDS,
+        raise_errors=raise_llm_errors, features=features
+    )
+
+    # 3. Role-weighted hybrid score + Report data (PDF is rendered on first download)
+    final_data = build_analysis(role_config, raw_llm, k_score, f_score, report_store, keyword_details, features)
+    await run_in_threadpool(index_candidate, candidate_index, resume_text, None, final_data)
     
-    return data
+    return AnalysisResponse(**final_data)
 
-def safe_parse_llm_response(response_data):
-    # response_data is likely already a dict from our updated LLM service,
-    # but strictly following user request to handle parsing safety.
-    if isinstance(response_data, dict):
-        return normalize_llm_response(response_data)
-        
+def resolve_role(role_id: str = None, job_description: str = None, jd_id: str = None) -> dict:
+    """
+    Role config for a request: a catalog role_id, a previously registered jd_id,
+    or free-text job_description (keywords/weights extracted once per JD and cached).
+    Raises LookupError / ValueError.
+    """
+    if job_description and job_description.strip():
+        _, role_config = jd_analyzer.analyze(job_description)
+        return role_config
+    if jd_id:
+        role_config = jd_analyzer.get(jd_id)
+        if not role_config:
+            raise LookupError("Job description not found")
+        return role_config
+    if role_id:
+        role_config = ROLES.get(role_id)
+        if not role_config:
+            raise LookupError("Role not found")
+        return role_config
+    raise ValueError("Provide role_id, jd_id or job_description")
+
+def role_label(role_id: str = None, job_description: str = None, jd_id: str = None) -> str:
+    """ID of the role resolve_role picks for the same arguments (same precedence)."""
+    if job_description and job_description.strip():
+        return jd_id_for(job_description)
+    return jd_id or role_id
+
+def resolve_role_or_http(role_id: str = None, job_description: str = None, jd_id: str = None) -> dict:
     try:
-        parsed = json.loads(response_data)
-        return normalize_llm_response(parsed)
-    except Exception:
-        return {
-            "atsScore": 0,
-            "strengths": [],
-            "weaknesses": ["AI response parsing failed"],
-            "improvementSuggestions": ["Ensure Ollama is running correctly"],
-            "summary": "Analysis failed",
-            "candidateName": "Unknown",
-            "bestRole": "Unknown",
-            "skills": [],
-            "experienceHighlights": [], 
-            "education": [],
-            "section_scores": {}
-        }
+        return resolve_role(role_id, job_description, jd_id)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+async def analysis_job(payload: dict) -> dict:
+    role_config = resolve_role(payload.get("role_id"), payload.get("job_description"), payload.get("jd_id"))
+    # Raise on Ollama failure so the queue retries instead of storing a zero score
+    result = await run_analysis(payload["resume_text"], role_config, raise_llm_errors=True)
+    return result.model_dump()
+
+job_queue.register("analyze", analysis_job)
 
 @app.post("/analyze", response_model=AnalysisResponse)
-def analyze_resume(request: AnalysisRequest):
-    role_config = ROLES.get(request.role_id)
+async def analyze_resume(request: AnalysisRequest, mode: str = "sync", priority: str = "interactive"):
+    """
+    mode=sync (default) answers with the analysis. mode=async queues a job and
+    returns its ID at once (HTTP 202); poll /jobs/{id} or subscribe to /jobs/{id}/events.
+    mode=fast skips the LLM and answers in milliseconds with an estimated score (estimated=true).
+    """
+    role_config = resolve_role_or_http(request.role_id, request.job_description, request.jd_id)
+
+    if mode == "async":
+        try:
+            job = job_queue.submit("analyze", request.model_dump(), priority=priority)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return JSONResponse(
+            status_code=202,
+            content={"job_id": job["id"], "status": job["status"], "status_url": f"/jobs/{job['id']}"}
+        )
+
+    return await run_analysis(request.resume_text, role_config, fast=mode == "fast")
+
+@app.post("/analyze/multi", response_model=MultiRoleAnalysisResponse)
+async def analyze_multi_role(request: MultiRoleAnalysisRequest):
+    """
+    One resume against many roles with a single LLM pass: role-independent
+    facts (skills, experience years, education, highlights) are extracted once
+    into a profile, then every role is scored deterministically from the
+    profile and the role's keywords and weights. Role-specific narratives are
+    generated on request by POST /profiles/{profile_id}/narrative.
+    """
+    if request.role_ids is not None and not request.role_ids:
+        # An empty list would spend an LLM pass and rank nothing; omit role_ids for every role
+        raise HTTPException(status_code=422, detail="role_ids must not be empty; omit it to rank every role")
+    unknown = [r for r in request.role_ids or [] if r not in ROLES]
+    if unknown:
+        raise HTTPException(status_code=404, detail=f"Unknown roles: {', '.join(unknown)}")
+
+    profile_id = candidate_id_for(request.resume_text)
+    task = asyncio.ensure_future(ollama_service.extract_profile(request.resume_text))
+    task.add_done_callback(lambda t: t.cancelled() or t.exception())
+    try:
+        # shield: on timeout the extraction keeps running and fills the cache for the next request
+        with stage("llm_profile"):
+            profile = await asyncio.wait_for(asyncio.shield(task), LLM_FAST_FALLBACK_SECONDS or None)
+        profile_store.set(profile_id, profile)
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        logger.warning(f"Profile extraction unavailable ({e!r}); ranking roles from the resume text only")
+        SCORE_ESTIMATES.inc(reason="llm_timeout" if isinstance(e, asyncio.TimeoutError) else "llm_error")
+        profile = None
+
+    with stage("rank_roles"):
+        roles = scoring_engine.rank_roles(
+            request.resume_text, max(request.top_k, 1), profile=profile, role_ids=request.role_ids
+        )
+    return {"profile_id": profile_id, "profile": profile, "estimated": profile is None, "roles": roles}
+
+@app.get("/profiles/{profile_id}")
+def get_profile(profile_id: str):
+    profile = profile_store.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return profile
+
+@app.post("/profiles/{profile_id}/narrative", response_model=RoleNarrative)
+async def profile_narrative(profile_id: str, request: RoleNarrativeRequest):
+    """Strengths, weaknesses and improvements for one role, generated from the stored profile (cached)."""
+    profile = profile_store.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found; run /analyze/multi first")
+    role_config = resolve_role_or_http(request.role_id, request.job_description, request.jd_id)
+    try:
+        with stage("llm_narrative"):
+            narrative = await ollama_service.role_narrative(profile, role_config)
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        logger.error(f"Role narrative failed: {e}")
+        raise HTTPException(status_code=503, detail="AI service unavailable")
+    return {**narrative, "profile_id": profile_id, "role_title": role_config["title"]}
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    job = job_queue.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@app.get("/jobs/{job_id}/events")
+async def job_events(job_id: str):
+    """SSE stream of job state changes; ends once the job succeeds or fails."""
+    if not job_queue.get(job_id):
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def events():
+        async for job in job_queue.events(job_id):
+            yield sse_event("job", job)
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+def sse_event(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.post("/analyze/stream")
+async def analyze_resume_stream(request: AnalysisRequest):
+    """
+    Server-Sent Events version of /analyze.
+
+    Events: `scores` (deterministic scores, immediately), `field` (each top-level
+    LLM field as soon as it is complete), then `result` (the full AnalysisResponse
+    with the hybrid score) or `error`.
+    """
+    role_config = resolve_role_or_http(request.role_id, request.job_description, request.jd_id)
+
+    async def events():
+        k_score, f_score, keyword_details = deterministic_scores(request.resume_text, role_config)
+        features = deterministic_features(request.resume_text, keyword_details, f_score)
+        yield sse_event("scores", {
+            "keyword_match_score": k_score, "formatting_score": f_score,
+            "missing_keywords": keyword_details["missing"], "matched_keywords": keyword_details["matched"]
+        })
+
+        parser = IncrementalJSONObjectParser()
+        parts = []
+        try:
+            async for chunk in ollama_service.stream_analysis(request.resume_text, role_config):
+                parts.append(chunk)
+                for key, value in parser.feed(chunk):
+                    yield sse_event("field", {"key": key, "value": value})
+            # Lenient parse (fences, trailing commas, truncation); no repair round-trip mid-stream
+            raw_llm = parse_analysis("".join(parts)).data
+            if "atsScore" not in raw_llm:
+                raw_llm = fill_missing_score(raw_llm, score_estimator, features, role_config)
+        except Exception as e:
+            logger.error(f"Ollama Stream Failed: {e}")
+            UPSTREAM_ERRORS.inc(upstream="llm", reason="stream")
+            raw_llm = estimated_llm_result(score_estimator, features, role_config)
+
+        try:
+            final_data = build_analysis(role_config, raw_llm, k_score, f_score, report_store, keyword_details, features)
+            yield sse_event("result", AnalysisResponse(**final_data).model_dump())
+        except Exception as e:
+            logger.error(f"Stream analysis failed: {e}")
+            yield sse_event("error", {"detail": str(e)})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.get("/roles")
+def get_roles(request: Request):
+    """Role catalog, pre-rendered per catalog version; revalidate with If-None-Match."""
+    catalog = ROLE_CATALOG.current
+    headers = {"ETag": catalog.etag, "Cache-Control": "no-cache", "X-Roles-Version": catalog.version}
+    if catalog.not_modified(request.headers.get("if-none-match")):
+        return Response(status_code=304, headers=headers)
+    return Response(catalog.body, media_type="application/json", headers=headers)
+
+@app.post("/roles/rank", response_model=List[RoleScore])
+def rank_roles(request: RoleMatchRequest):
+    """Role-weighted hybrid score of one resume against every catalog role in one pass (estimated AI score, no LLM)."""
+    with stage("rank_roles"):
+        return scoring_engine.rank_roles(request.resume_text, max(request.top_k, 1))
+
+@app.post("/roles/{role_id}/score", response_model=List[RoleScore])
+def score_for_role(role_id: str, request: RoleScoreBatchRequest):
+    """Role-weighted hybrid scores of a batch of resumes against one role, in input order (no LLM)."""
+    role_config = ROLES.get(role_id)
     if not role_config:
         raise HTTPException(status_code=404, detail="Role not found")
-    
-    # 1. Deterministic Scoring
-    k_score = keyword_density_score(request.resume_text, role_config.get("keywords", []))
-    f_score = formatting_score(request.resume_text)
-    
-    # 2. AI Analysis
-    raw_llm = ollama_service.analyze_resume(request.resume_text, role_config)
-    analysis_result = safe_parse_llm_response(raw_llm)
-    
-    ai_score = analysis_result.get("atsScore", 0)
-    if isinstance(ai_score, str): # Handle potential string return
-        try:
-            ai_score = float(ai_score)
-        except:
-            ai_score = 0
-            
-    # 3. Hybrid Normalization
-    final_score = normalize_ats_score(ai_score, k_score, f_score)
-    
-    # 4. Generate Report
-    report_data = {
-        "Generated On": "Now", # In prod use datetime
-        "Candidate Name": analysis_result.get("candidateName", "Unknown"),
-        "Target Role": role_config["title"],
-        "Final Score": final_score,
-        "Keyword Match": k_score,
-        "AI Score": ai_score,
-        "Strengths": analysis_result.get("strengths", []),
-        "Improvements": analysis_result.get("improvementSuggestions", [])
+    if len(request.resume_texts) > BATCH_MAX_FILES:
+        raise HTTPException(status_code=413, detail=f"Batch too large (max {BATCH_MAX_FILES} resumes)")
+    with stage("score_batch"):
+        details = [deterministic_scores(text, role_config) for text in request.resume_texts]
+        features = [
+            deterministic_features(text, keyword_details, f_score)
+            for text, (_, f_score, keyword_details) in zip(request.resume_texts, details)
+        ]
+        scores = scoring_engine.score_batch(features, role_config["weights"])
+    return [
+        {
+            "role_id": role_id, "title": role_config["title"], "score": float(scores["score"][i]),
+            "ai_estimate": float(scores["ai_score"][i]), "section_score": float(scores["section_score"][i]),
+            "keyword_match_score": k_score,
+        }
+        for i, (k_score, _, _) in enumerate(details)
+    ]
+
+@app.get("/roles/{role_id}/candidates")
+def role_candidates(role_id: str, limit: int = 20, min_score: float = 0.0):
+    """Stored candidates ranked against a role's keywords (same density as keyword_density_score), no LLM."""
+    role_config = ROLES.get(role_id)
+    if not role_config:
+        raise HTTPException(status_code=404, detail="Role not found")
+    if candidate_index is None:
+        raise HTTPException(status_code=503, detail="Candidate index is disabled")
+    return {
+        "role_id": role_id,
+        "candidates": candidate_index.search(role_config.get("keywords", []), limit=min(max(limit, 1), 500), min_score=min_score)
     }
-    
-    report_filename = f"report_{uuid.uuid4().hex[:8]}.pdf"
-    report_path = os.path.join("reports", report_filename)
-    os.makedirs("reports", exist_ok=True)
-    
+
+@app.delete("/candidates/{candidate_id}")
+def delete_candidate(candidate_id: str):
+    if candidate_index is None or not candidate_index.delete(candidate_id):
+        raise HTTPException(status_code=404, detail="Candidate not found")
+    return {"deleted": candidate_id}
+
+@app.post("/job-descriptions")
+def register_job_description(request: JobDescriptionRequest):
+    """Extracts keywords/weights from a JD once; pass the returned jd_id to /analyze for each candidate."""
+    jd_id, role_config = jd_analyzer.analyze(request.job_description)
+    return {"jd_id": jd_id, "role": role_config}
+
+@app.get("/job-descriptions/{jd_id}")
+def get_job_description(jd_id: str):
+    role_config = jd_analyzer.get(jd_id)
+    if not role_config:
+        raise HTTPException(status_code=404, detail="Job description not found")
+    return {"jd_id": jd_id, "role": role_config}
+
+@app.post("/roles/match", response_model=List[RoleMatch])
+def match_roles(request: RoleMatchRequest):
+    """Top-k roles by semantic similarity to the resume."""
+    return role_matcher.top_k(request.resume_text, max(request.top_k, 1))
+
+@app.post("/batch/analyze")
+async def batch_analyze(
+    files: List[UploadFile] = File(...),
+    role_id: Optional[str] = Form(None),
+    job_description: Optional[str] = Form(None),
+    jd_id: Optional[str] = Form(None),
+    fast: bool = Form(False)
+):
+    """
+    Screens many resumes (files and/or .zip archives) against one role or job
+    description, streaming NDJSON results. A JD is analyzed once for the whole batch.
+    fast=true skips the LLM and scores every resume with the deterministic estimate.
+    """
+    role_config = resolve_role_or_http(role_id, job_description, jd_id)
+    role_id = role_label(role_id, job_description, jd_id)
+
+    # Spooled upload files are handed over as is; nothing is read into memory here
+    uploads = [(f.filename, f.file) for f in files]
+    try:
+        items = await run_in_threadpool(expand_uploads, uploads)
+    except ValueError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Invalid batch upload: {e}")
+
+    return StreamingResponse(
+        batch_pipeline.run(items, role_id, role_config, fast=fast),
+        media_type="application/x-ndjson"
+    )
+
+@app.get("/reports/stats")
+def report_stats():
+    """Report store size (recounted each GC pass, updated on every save/render) and eviction counters."""
+    return report_store.stats()
+
+@app.get("/reports/{report_id}.pdf")
+async def get_report(report_id: str):
+    """Renders the report on first request; later requests are served from disk."""
+    if not report_store.exists(report_id):
+        raise HTTPException(status_code=404, detail="Report not found")
     try:
-        generate_ats_report(report_path, report_data)
+        path = await run_in_threadpool(report_store.render, report_id)
     except Exception as e:
         logger.error(f"Report generation failed: {e}")
-        report_filename = None
-
-    # 5. Prepare Response
-    response_data = analysis_result.copy()
-    defaults = {
-        "atsScore": ai_score, # Keep original AI score in this field or use final? Let's use AI score here as component
-        "bestRole": role_config["title"], "candidateName": "Unknown", "summary": "No summary",
-        "skills": [], "experienceHighlights": [], "education": [], 
-        "strengths": [], "weaknesses": [], "improvementSuggestions": [], "missing_keywords": [],
-        "keyword_match_score": k_score,
-        "final_ats_score": final_score,
-        "report_file": report_filename
-    }
-    
-    final_data = {**defaults, **response_data}
-    final_data["final_ats_score"] = final_score # Ensure overwrites
-    final_data["atsScore"] = int(final_score) # Update main score to be the hybrid one for UI consistency
-    
-    return AnalysisResponse(**final_data)
+        raise HTTPException(status_code=500, detail="Report generation failed")
+    return FileResponse(path, media_type="application/pdf", filename=os.path.basename(path))
 
-@app.get("/roles")
-def get_roles():
-    return ROLES
+@app.post("/reports/export")
+async def export_reports(request: ReportExportRequest):
+    """Bundles many reports (e.g. a batch run) into a single zip."""
+    buffer = await run_in_threadpool(report_store.export_zip, request.report_ids)
+    return StreamingResponse(
+        buffer,
+        media_type="application/zip",
+        headers={"Content-Disposition": 'attachment; filename="reports.zip"'}
+    )
@@ -1,20 +1,78 @@
 from pydantic import BaseModel
 from typing import List, Optional
 
+class RoleMatch(BaseModel):
+    role_id: str
+    title: str
+    score: float
+
 class ResumeUploadResponse(BaseModel):
     filename: str
     extracted_text: str
     status: str
     detected_role: Optional[str] = None
+    role_matches: List[RoleMatch] = []
+    candidate_id: Optional[str] = None
 
 class AnalysisRequest(BaseModel):
+    resume_text: str
+    # One of: a catalog role, a registered JD (from /job-descriptions), or free-text JD
+    role_id: Optional[str] = None
+    jd_id: Optional[str] = None
+    job_description: Optional[str] = None
+
+class JobDescriptionRequest(BaseModel):
+    job_description: str
+
+class RoleMatchRequest(BaseModel):
+    resume_text: str
+    top_k: int = 5
+
+class RoleScore(BaseModel):
     role_id: str
+    title: str
+    score: float  # hybrid score with the estimated AI score
+    ai_estimate: float
+    section_score: float  # section scores weighted by the role's weights
+    keyword_match_score: float
+
+class RoleScoreBatchRequest(BaseModel):
+    resume_texts: List[str]
+
+class MultiRoleAnalysisRequest(BaseModel):
     resume_text: str
+    role_ids: Optional[List[str]] = None  # default: every catalog role
+    top_k: int = 10
+
+class MultiRoleAnalysisResponse(BaseModel):
+    profile_id: str
+    profile: Optional[dict] = None  # None when the LLM was unavailable (estimated scores only)
+    estimated: bool = False
+    roles: List[RoleScore]
+
+class RoleNarrativeRequest(BaseModel):
+    # One of: a catalog role, a registered JD, or free-text JD (as in AnalysisRequest)
+    role_id: Optional[str] = None
+    jd_id: Optional[str] = None
+    job_description: Optional[str] = None
+
+class RoleNarrative(BaseModel):
+    profile_id: str
+    role_title: str
+    summary: Optional[str] = None
+    strengths: List[str] = []
+    weaknesses: List[str] = []
+    improvementSuggestions: List[str] = []
 
 class Skill(BaseModel):
     name: str
     category: str
 
+class KeywordMatch(BaseModel):
+    keyword: str
+    count: int
+    spans: List[List[int]]  # [start, end) character offsets into resume_text
+
 class AnalysisResponse(BaseModel):
     # Core Analysis
     atsScore: int
@@ -34,9 +92,21 @@ class AnalysisResponse(BaseModel):
     section_scores: Optional[dict] = {}
     keyword_match_score: Optional[float] = 0.0
     final_ats_score: Optional[float] = 0.0
+    role_weighted_score: Optional[float] = None  # section scores weighted by the role's weights
     
     # Artifacts
     report_file: Optional[str] = None
+    report_url: Optional[str] = None
 
-    # Legacy/Extras (optional mapping)
+    # Keyword Details (deterministic scorer)
     missing_keywords: List[str] = []
+    matched_keywords: List[KeywordMatch] = []
+    keyword_weighted_score: Optional[float] = None
+
+    # Set when the AI score was estimated from deterministic features (fast mode or LLM unavailable)
+    estimated: bool = False
+    features: Optional[dict] = None
+
+class ReportExportRequest(BaseModel):
+    # IDs from report_url (/reports/<id>.pdf)
+    report_ids: List[str]
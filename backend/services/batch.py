@@ -0,0 +1,176 @@
+import os
+import json
+import asyncio
+import logging
+import zipfile
+import threading
+from backend.config import (
+    BATCH_PARSE_CONCURRENCY, BATCH_SCORE_CONCURRENCY, BATCH_LLM_CONCURRENCY, BATCH_MAX_FILES,
+    MAX_UPLOAD_MB, BATCH_MAX_UNCOMPRESSED_MB
+)
+from backend.models import AnalysisResponse
+from backend.services.analysis import (
+    deterministic_scores, deterministic_features, build_analysis, index_candidate, llm_or_estimate
+)
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_EXTENSIONS = (".pdf", ".docx", ".txt")
+
+
+class Archive:
+    """An uploaded zip, opened once; members are decompressed one at a time (the file is shared)."""
+
+    def __init__(self, file):
+        self.zf = zipfile.ZipFile(file)
+        self.lock = threading.Lock()
+
+    def read(self, info: zipfile.ZipInfo) -> bytes:
+        with self.lock:
+            # ZipExtFile stops at the declared file_size, which expand_uploads has checked
+            return self.zf.read(info)
+
+
+class BatchItem:
+    """
+    One resume in a batch. Plain uploads stay in their spooled file and are
+    streamed to the parser; zip members are only decompressed when the parse
+    stage reaches them. An item with `error` was rejected up front.
+    """
+
+    def __init__(self, filename: str, file=None, archive: Archive = None, info: zipfile.ZipInfo = None,
+                 error: str = None):
+        self.filename = filename
+        self.error = error
+        self._file = file
+        self._archive = archive
+        self._info = info
+
+    def read(self):
+        """Bytes of a zip member, or the seekable upload file itself."""
+        if self.error:
+            raise ValueError(self.error)
+        if self._archive is not None:
+            return self._archive.read(self._info)
+        self._file.seek(0)
+        return self._file
+
+
+def _file_size(file) -> int:
+    file.seek(0, os.SEEK_END)
+    size = file.tell()
+    file.seek(0)
+    return size
+
+
+def expand_uploads(uploads):
+    """
+    Turns (filename, seekable file) uploads into BatchItems, flattening any
+    .zip archives. Only the archives' central directories are read here.
+
+    Files and zip members above MAX_UPLOAD_MB become error items; archives
+    whose members add up to more than BATCH_MAX_UNCOMPRESSED_MB, or more
+    than BATCH_MAX_FILES items, reject the whole batch with ValueError.
+    """
+    max_file = int(MAX_UPLOAD_MB * 1024 * 1024)
+    max_total = int(BATCH_MAX_UNCOMPRESSED_MB * 1024 * 1024)
+    too_large = f"File too large (max {MAX_UPLOAD_MB:g} MB)"
+    items = []
+    uncompressed = 0
+    for filename, file in uploads:
+        filename = filename or "resume"
+        if filename.lower().endswith(".zip"):
+            archive = Archive(file)
+            for info in archive.zf.infolist():
+                name = info.filename
+                if info.is_dir() or name.startswith("__MACOSX/") or not name.lower().endswith(SUPPORTED_EXTENSIONS):
+                    continue
+                if info.file_size > max_file:
+                    items.append(BatchItem(name, error=too_large))
+                    continue
+                uncompressed += info.file_size
+                if uncompressed > max_total:
+                    raise ValueError(f"Batch archives too large when decompressed (max {BATCH_MAX_UNCOMPRESSED_MB:g} MB)")
+                items.append(BatchItem(name, archive=archive, info=info))
+        elif _file_size(file) > max_file:
+            items.append(BatchItem(filename, error=too_large))
+        else:
+            items.append(BatchItem(filename, file=file))
+
+    if len(items) > BATCH_MAX_FILES:
+        raise ValueError(f"Batch too large: {len(items)} files (max {BATCH_MAX_FILES})")
+    return items
+
+
+class BatchPipeline:
+    """
+    Bounded-concurrency parse -> score -> LLM pipeline.
+
+    Every candidate moves through the stages independently; each stage has its
+    own semaphore, so parsing keeps going while the LLM stage is saturated.
+    Results are yielded as NDJSON lines in completion order.
+    """
+
+    def __init__(self, parser, llm, report_store, candidate_index=None, estimator=None,
+                 parse_limit=BATCH_PARSE_CONCURRENCY, score_limit=BATCH_SCORE_CONCURRENCY,
+                 llm_limit=BATCH_LLM_CONCURRENCY):
+        self.parser = parser
+        self.llm = llm
+        self.report_store = report_store
+        self.candidate_index = candidate_index
+        self.estimator = estimator
+        self.parse_sem = asyncio.Semaphore(parse_limit)
+        self.score_sem = asyncio.Semaphore(score_limit)
+        self.llm_sem = asyncio.Semaphore(llm_limit)
+
+    async def _process(self, index: int, item: BatchItem, role_id: str, role_config: dict, fast: bool = False) -> dict:
+        result = {"index": index, "filename": item.filename, "role_id": role_id}
+        try:
+            async with self.parse_sem:
+                content = await asyncio.to_thread(item.read)
+                text = await asyncio.to_thread(self.parser.parse_resume, content, item.filename)
+
+            async with self.score_sem:
+                k_score, f_score, keyword_details = deterministic_scores(text, role_config)
+                features = deterministic_features(text, keyword_details, f_score)
+
+            if self.estimator is None:
+                async with self.llm_sem:
+                    raw_llm = await self.llm.analyze_resume(text, role_config)
+            elif fast:
+                raw_llm = await llm_or_estimate(
+                    self.llm, self.estimator, text, role_config, keyword_details, f_score, fast=True, features=features
+                )
+            else:
+                async with self.llm_sem:
+                    raw_llm = await llm_or_estimate(
+                        self.llm, self.estimator, text, role_config, keyword_details, f_score, features=features
+                    )
+
+            final_data = build_analysis(
+                role_config, raw_llm, k_score, f_score, self.report_store, keyword_details, features
+            )
+            result["analysis"] = AnalysisResponse(**final_data).model_dump()
+            result["candidate_id"] = await asyncio.to_thread(
+                index_candidate, self.candidate_index, text, item.filename, final_data
+            )
+            result["status"] = "success" if "Warning:" not in text else "partial_success"
+        except Exception as e:
+            logger.error(f"Batch item {item.filename} failed: {e}")
+            result["status"] = "error"
+            result["error"] = str(e)
+        return result
+
+    async def run(self, items, role_id: str, role_config: dict, fast: bool = False):
+        tasks = [
+            asyncio.create_task(self._process(i, item, role_id, role_config, fast))
+            for i, item in enumerate(items)
+        ]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                result = await next_done
+                yield json.dumps(result) + "\n"
+        finally:
+            # Client went away: don't keep burning LLM time on the rest.
+            for task in tasks:
+                task.cancel()
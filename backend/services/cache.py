@@ -0,0 +1,202 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+
+
+def content_hash(*parts) -> str:
+    """SHA-256 over the JSON encoding of the given parts (bytes are hashed raw)."""
+    h = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, bytes):
+            h.update(part)
+        else:
+            h.update(json.dumps(part, sort_keys=True, default=str).encode("utf-8"))
+        h.update(b"\x00")
+    return h.hexdigest()
+
+
+class LRUCache:
+    """
+    In-memory LRU with optional TTL and optional byte budget.
+
+    `sizeof(value)` is only used when max_bytes is set.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: float = None, max_bytes: int = None, sizeof=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof or (lambda value: len(json.dumps(value, default=str)))
+        self.bytes = 0
+        self.evictions = 0
+        self._data = OrderedDict()  # key -> (expires_at, size, value)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, size, value = entry
+            if expires_at is not None and expires_at < time.time():
+                self._drop(key)
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value) -> list:
+        """Stores value; returns the (key, value) pairs evicted to make room."""
+        size = self.sizeof(value) if self.max_bytes else 0
+        expires_at = time.time() + self.ttl if self.ttl else None
+        evicted = []
+        with self._lock:
+            if key in self._data:
+                self._drop(key)
+            self._data[key] = (expires_at, size, value)
+            self.bytes += size
+            while self._data and (
+                len(self._data) > self.max_entries
+                or (self.max_bytes and self.bytes > self.max_bytes and len(self._data) > 1)
+            ):
+                old_key, (_, _, old_value) = next(iter(self._data.items()))
+                self._drop(old_key)
+                self.evictions += 1
+                evicted.append((old_key, old_value))
+        return evicted
+
+    def delete(self, key):
+        with self._lock:
+            if key in self._data:
+                self._drop(key)
+
+    def _drop(self, key):
+        _, size, _ = self._data.pop(key)
+        self.bytes -= size
+
+    def __len__(self):
+        return len(self._data)
+
+
+class SQLiteCache:
+    """Persistent key -> JSON value store with TTL and an entry cap (oldest written go first)."""
+
+    def __init__(self, path: str, ttl: float = None, max_entries: int = None):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._writes = 0
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS cache_created ON cache (created_at)")
+        self._conn.commit()
+        self.purge()
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute("SELECT value, created_at FROM cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        value, created_at = row
+        if self.ttl and created_at + self.ttl < time.time():
+            self.delete(key)
+            return None
+        return json.loads(value)
+
+    def set(self, key, value):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, created_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value, default=str), time.time())
+            )
+            self._conn.commit()
+            self._writes += 1
+            prune = self.max_entries and self._writes % 100 == 0
+        if prune:
+            self.purge()
+
+    def delete(self, key):
+        with self._lock:
+            self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def purge(self):
+        """Drops expired rows and trims to max_entries."""
+        with self._lock:
+            if self.ttl:
+                self._conn.execute("DELETE FROM cache WHERE created_at < ?", (time.time() - self.ttl,))
+            if self.max_entries:
+                self._conn.execute(
+                    "DELETE FROM cache WHERE key NOT IN (SELECT key FROM cache ORDER BY created_at DESC LIMIT ?)",
+                    (self.max_entries,)
+                )
+            self._conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+
+class TieredCache:
+    """
+    Memory LRU in front of an optional SQLite tier, with hit/miss counters.
+
+    With spill=True the disk tier only receives entries evicted from memory
+    instead of every write.
+    """
+
+    def __init__(self, name: str, memory: LRUCache, disk: SQLiteCache = None, spill: bool = False):
+        self.name = name
+        self.memory = memory
+        self.disk = disk
+        self.spill = spill
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        value = self.memory.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+        if self.disk is not None:
+            value = self.disk.get(key)
+            if value is not None:
+                self.hits += 1
+                self.disk_hits += 1
+                self._spill(self.memory.set(key, value))
+                return value
+        self.misses += 1
+        return None
+
+    def set(self, key, value):
+        evicted = self.memory.set(key, value)
+        if self.disk is not None and not self.spill:
+            self.disk.set(key, value)
+        self._spill(evicted)
+
+    def _spill(self, evicted):
+        if self.disk is not None and self.spill:
+            for old_key, old_value in evicted:
+                self.disk.set(old_key, old_value)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "name": self.name,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "memory_entries": len(self.memory),
+            "memory_bytes": self.memory.bytes,
+            "memory_evictions": self.memory.evictions,
+            "disk_entries": len(self.disk) if self.disk is not None else 0,
+        }
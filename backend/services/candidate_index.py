@@ -0,0 +1,125 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from backend.services.keyword_index import RoleKeywordIndex
+
+
+def candidate_id_for(resume_text: str) -> str:
+    """Stable ID from the normalized text, so /upload and /analyze refer to the same candidate."""
+    normalized = " ".join(resume_text.split()).lower()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()[:16]
+
+
+class CandidateIndex:
+    """
+    Inverted index of stored resumes for "role -> candidates" search.
+
+    Each resume is scanned once with the role keyword index and one posting
+    (keyword, candidate, count) is written per matched catalog keyword. Ranking
+    a role is then a single GROUP BY over that role's postings, which gives the
+    same matched/total density as keyword_density_score without touching
+    the resume text or the LLM.
+    """
+
+    def __init__(self, path: str, keyword_index: RoleKeywordIndex):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.keyword_index = keyword_index
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS candidates (
+                id TEXT PRIMARY KEY,
+                filename TEXT,
+                text TEXT NOT NULL,
+                skills TEXT NOT NULL DEFAULT '[]',
+                created_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS postings (
+                keyword TEXT NOT NULL,
+                candidate_id TEXT NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (keyword, candidate_id)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS postings_candidate ON postings (candidate_id);
+            """
+        )
+        self._conn.commit()
+
+    def _postings(self, candidate_id: str, text: str) -> list:
+        scan = self.keyword_index.scan(text)
+        return [(keyword, candidate_id, count) for keyword, count in scan.counts.items()]
+
+    def add(self, resume_text: str, filename: str = None, skills: list = None) -> str:
+        candidate_id = candidate_id_for(resume_text)
+        postings = self._postings(candidate_id, resume_text)
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO candidates (id, filename, text, skills, created_at) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET filename = COALESCE(excluded.filename, filename)",
+                (candidate_id, filename, resume_text, json.dumps(skills or []), time.time())
+            )
+            if skills is not None:
+                self._conn.execute("UPDATE candidates SET skills = ? WHERE id = ?", (json.dumps(skills), candidate_id))
+            self._conn.execute("DELETE FROM postings WHERE candidate_id = ?", (candidate_id,))
+            self._conn.executemany("INSERT INTO postings (keyword, candidate_id, count) VALUES (?, ?, ?)", postings)
+            self._conn.commit()
+        return candidate_id
+
+    def delete(self, candidate_id: str) -> bool:
+        with self._lock:
+            self._conn.execute("DELETE FROM postings WHERE candidate_id = ?", (candidate_id,))
+            deleted = self._conn.execute("DELETE FROM candidates WHERE id = ?", (candidate_id,)).rowcount
+            self._conn.commit()
+        return deleted > 0
+
+    def reindex(self, keyword_index: RoleKeywordIndex):
+        """Rebuilds all postings, e.g. after the role catalog gained new keywords."""
+        self.keyword_index = keyword_index
+        with self._lock:
+            rows = self._conn.execute("SELECT id, text FROM candidates").fetchall()
+        postings = [p for candidate_id, text in rows for p in self._postings(candidate_id, text)]
+        with self._lock:
+            self._conn.execute("DELETE FROM postings")
+            self._conn.executemany("INSERT INTO postings (keyword, candidate_id, count) VALUES (?, ?, ?)", postings)
+            self._conn.commit()
+
+    def search(self, keywords: list, limit: int = 20, min_score: float = 0.0) -> list:
+        """Candidates ranked by keyword density (then total keyword frequency) for the given keywords."""
+        keys = list(dict.fromkeys(k.lower() for k in keywords))
+        if not keys:
+            return []
+        placeholders = ",".join("?" * len(keys))
+        with self._lock:
+            rows = self._conn.execute(
+                f"""SELECT p.candidate_id, c.filename, c.skills, COUNT(*) AS matched, SUM(p.count) AS hits,
+                           GROUP_CONCAT(p.keyword, '|') AS matched_keywords
+                    FROM postings p JOIN candidates c ON c.id = p.candidate_id
+                    WHERE p.keyword IN ({placeholders})
+                    GROUP BY p.candidate_id
+                    ORDER BY matched DESC, hits DESC
+                    LIMIT ?""",
+                (*keys, limit)
+            ).fetchall()
+
+        results = []
+        for candidate_id, filename, skills, matched, hits, matched_keywords in rows:
+            score = round((matched / len(keys)) * 100, 2)
+            if score < min_score:
+                continue
+            results.append({
+                "candidate_id": candidate_id,
+                "filename": filename,
+                "keyword_match_score": score,
+                "matched_keywords": sorted(matched_keywords.split("|")),
+                "keyword_hits": hits,
+                "skills": json.loads(skills),
+            })
+        return results
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM candidates").fetchone()[0]
@@ -0,0 +1,165 @@
+import os
+import re
+import time
+import sqlite3
+import logging
+import threading
+from datetime import date
+import numpy as np
+from backend.services.prompt_compactor import clean_lines, split_sections
+
+logger = logging.getLogger(__name__)
+
+CORE_SECTIONS = ("skills", "experience", "education", "projects", "summary")
+
+MONTHS = "jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec"
+# "2018 - 2022", "Jan 2019 – Present", "03/2017 to 11/2020"
+DATE_RANGE_RE = re.compile(
+    rf"(?:(?:{MONTHS})[a-z]*\.?\s+|\d{{1,2}}/)?((?:19|20)\d{{2}})\s*(?:-|–|—|to)\s*"
+    rf"(?:(?:{MONTHS})[a-z]*\.?\s+|\d{{1,2}}/)?((?:19|20)\d{{2}}|present|current|now|date)",
+    re.I
+)
+# "5+ years of experience", "7 yrs experience"
+YEARS_CLAIM_RE = re.compile(r"\b(\d{1,2})\s*\+?\s*(?:years?|yrs?)\b(?:\s+of)?\s+(?:\w+\s+)?experience", re.I)
+EXPERIENCE_TARGET_YEARS = 5
+EDUCATION_RE = re.compile(r"\b(bachelor|master|phd|degree|b\.?tech|b\.?sc|m\.?sc|b\.?e|m\.?tech|mba|university|college)\b", re.I)
+
+
+def experience_years(resume_text: str) -> float:
+    """Years of experience from date ranges (overlaps merged), or an explicit "N years" claim if larger."""
+    this_year = date.today().year
+    spans = []
+    for start, end in DATE_RANGE_RE.findall(resume_text):
+        start = int(start)
+        end = this_year if not end[0].isdigit() else int(end)
+        if start <= end <= this_year:
+            spans.append((start, end))
+
+    total, current_start, current_end = 0, None, None
+    for start, end in sorted(spans):
+        if current_end is None or start > current_end:
+            if current_end is not None:
+                total += current_end - current_start
+            current_start, current_end = start, end
+        else:
+            current_end = max(current_end, end)
+    if current_end is not None:
+        total += current_end - current_start
+
+    claims = [int(y) for y in YEARS_CLAIM_RE.findall(resume_text)]
+    return float(max([total] + claims))
+
+
+def base_features(resume_text: str, f_score: float) -> dict:
+    """The role-independent features: experience, education, formatting (+ coverage and years)."""
+    sections = {name for name, _ in split_sections(clean_lines(resume_text))}
+    coverage = len(sections & set(CORE_SECTIONS)) / len(CORE_SECTIONS) * 100
+    years = experience_years(resume_text)
+    experience = min(years / EXPERIENCE_TARGET_YEARS, 1.0) * 100
+    if "experience" in sections:
+        experience = max(experience, 30.0)
+    education = 100.0 if EDUCATION_RE.search(resume_text) else (50.0 if "education" in sections else 0.0)
+    return {
+        "experience": round(experience, 2),
+        "education": education,
+        "formatting": round((f_score + coverage) / 2, 2),
+        "section_coverage": round(coverage, 2),
+        "experience_years": years,
+    }
+
+
+def extract_features(resume_text: str, keyword_details: dict, f_score: float) -> dict:
+    """Deterministic 0-100 features, keyed like the role weights (skills, experience, ...)."""
+    base = base_features(resume_text, f_score)
+    return {
+        "skills": keyword_details["score"],
+        "experience": base["experience"],
+        "education": base["education"],
+        "formatting": base["formatting"],
+        "relevance": keyword_details["weighted_score"],
+        "section_coverage": base["section_coverage"],
+        "experience_years": base["experience_years"],
+    }
+
+
+def prior_score(features: dict, weights: dict) -> float:
+    """Role-weighted average of the features: the uncalibrated stand-in for the LLM score."""
+    weights = {k: v for k, v in (weights or {}).items() if k in features and v > 0}
+    if not weights:
+        weights = {"skills": 1, "experience": 1, "education": 1, "formatting": 1, "relevance": 1}
+    return sum(features[k] * w for k, w in weights.items()) / sum(weights.values())
+
+
+class ScoreEstimator:
+    """
+    LLM-free stand-in for the AI score.
+
+    The role-weighted feature average is mapped onto the LLM's scale with a
+    linear fit (score = a * prior + b) over recent (prior, LLM score) pairs,
+    which are recorded from every real analysis. Until `min_samples` pairs
+    exist the prior is used as is.
+    """
+
+    def __init__(self, path: str, window: int = 2000, min_samples: int = 20, refit_every: int = 25):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.window = window
+        self.min_samples = min_samples
+        self.refit_every = refit_every
+        self.slope, self.intercept = 1.0, 0.0
+        self.samples = 0
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS samples ("
+            "id TEXT PRIMARY KEY, prior REAL NOT NULL, llm_score REAL NOT NULL, created_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+        self.refit()
+
+    def refit(self):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT prior, llm_score FROM samples ORDER BY created_at DESC LIMIT ?", (self.window,)
+            ).fetchall()
+            self.samples = len(rows)
+            self._pending = 0
+            if len(rows) < self.min_samples:
+                return
+            data = np.asarray(rows, dtype=np.float64)
+            if np.ptp(data[:, 0]) < 1e-6:
+                return
+            self.slope, self.intercept = (float(v) for v in np.polyfit(data[:, 0], data[:, 1], 1))
+
+    def record(self, sample_id: str, features: dict, weights: dict, llm_score: float):
+        """
+        Adds a calibration pair from a real LLM analysis. sample_id is the
+        analysis cache key, so replayed cached analyses are not counted twice.
+        """
+        if not llm_score or llm_score <= 0:
+            return  # 0 is the "unavailable" placeholder, not a judgement
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO samples (id, prior, llm_score, created_at) VALUES (?, ?, ?, ?)",
+                (sample_id, prior_score(features, weights), float(llm_score), time.time())
+            )
+            self._conn.commit()
+            self._pending += 1
+            due = self._pending >= self.refit_every
+        if due:
+            self.refit()
+
+    def estimate(self, features: dict, weights: dict) -> float:
+        return float(self.calibrate(prior_score(features, weights)))
+
+    def calibrate(self, priors):
+        """Calibrated 0-100 score for a prior or an array of priors."""
+        return np.round(np.clip(self.slope * np.asarray(priors, dtype=np.float64) + self.intercept, 0.0, 100.0), 2)
+
+    def stats(self) -> dict:
+        return {
+            "samples": self.samples,
+            "calibrated": self.samples >= self.min_samples,
+            "slope": round(self.slope, 4),
+            "intercept": round(self.intercept, 4),
+        }
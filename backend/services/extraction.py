@@ -0,0 +1,136 @@
+import io
+import time
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import CancelledError, ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+
+logger = logging.getLogger(__name__)
+
+# Module-level functions so they can be pickled into worker processes.
+
+def extract_pdf_pages(content: bytes, start: int, stop: int) -> list:
+    from pypdf import PdfReader
+    reader = PdfReader(io.BytesIO(content))
+    return [reader.pages[i].extract_text() or "" for i in range(start, min(stop, len(reader.pages)))]
+
+
+def pdf_page_count(content: bytes) -> int:
+    from pypdf import PdfReader
+    return len(PdfReader(io.BytesIO(content)).pages)
+
+
+def extract_local(content: bytes, filename: str, max_pages: int = None) -> str:
+    """pypdf / docx2txt / plain-text extraction, used when Tika is unavailable."""
+    filename = filename.lower()
+
+    if filename.endswith(".pdf"):
+        pages = pdf_page_count(content)
+        if max_pages:
+            pages = min(pages, max_pages)
+        text = "\n".join(extract_pdf_pages(content, 0, pages)).strip()
+        return text if text else "Error: Empty PDF or unreadable."
+
+    elif filename.endswith(".docx"):
+        import docx2txt
+        # docx2txt opens its argument with zipfile, which reads
+        # file-like objects directly; no temp-file copy needed.
+        return docx2txt.process(io.BytesIO(content))
+
+    elif filename.endswith(".txt"):
+        return content.decode("utf-8", errors="ignore")
+
+    return "Error: Unsupported file format for local fallback. Please enable Tika."
+
+
+class LocalExtractor:
+    """
+    Runs local extraction on a process pool so CPU-bound pypdf work never holds
+    the GIL of the API process.
+
+    - workers=0 runs inline (useful for debugging).
+    - timeout bounds the wall time per document.
+    - max_pages caps how much of a PDF is read at all.
+    - PDFs longer than pages_per_task are split into page ranges extracted in parallel.
+
+    Workers are started with forkserver/spawn (never forked from the threaded
+    API process). All PDF parsing, including the page count, happens in the
+    workers. A timeout or a dead worker (OOM, crash in a C extension) replaces
+    the whole pool, so a pathological document cannot block later ones; after
+    a crash the document is retried once on the fresh pool.
+    """
+
+    def __init__(self, workers: int = 2, timeout: float = 30.0, max_pages: int = 50, pages_per_task: int = 10):
+        self.workers = workers
+        self.timeout = timeout
+        self.max_pages = max_pages
+        self.pages_per_task = pages_per_task
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                methods = multiprocessing.get_all_start_methods()
+                context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+                self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+            return self._pool
+
+    def _reset_pool(self, pool: ProcessPoolExecutor):
+        """Drops `pool` (if still current) and kills its workers; the next call starts a fresh one."""
+        with self._lock:
+            if self._pool is pool:
+                self._pool = None
+        processes = list((getattr(pool, "_processes", None) or {}).values())
+        pool.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._reset_pool(self._pool)
+
+    def extract(self, content: bytes, filename: str) -> str:
+        if self.workers <= 0:
+            return extract_local(content, filename, self.max_pages)
+
+        for attempt in range(2):
+            pool = self._get_pool()
+            try:
+                if filename.lower().endswith(".pdf"):
+                    return self._extract_pdf(pool, content)
+                return pool.submit(extract_local, content, filename, self.max_pages).result(timeout=self.timeout)
+            except FutureTimeout:
+                logger.error(f"Local extraction of {filename} timed out after {self.timeout}s; restarting the pool")
+                self._reset_pool(pool)
+                return f"Error: Parsing timed out after {self.timeout:.0f}s."
+            except (BrokenProcessPool, CancelledError, RuntimeError) as e:
+                # Cancelled / "cannot schedule new futures": another thread replaced the pool
+                if not isinstance(e, BrokenProcessPool) and self._pool is pool:
+                    raise
+                logger.warning(f"Local extraction pool unusable ({e!r}); retrying on a fresh pool")
+                self._reset_pool(pool)
+        logger.error(f"Local extraction of {filename} crashed its worker twice")
+        return "Error: Parsing failed (extraction worker crashed)."
+
+    def _extract_pdf(self, pool, content: bytes) -> str:
+        deadline = time.monotonic() + self.timeout  # one budget for the whole document
+        pages = pool.submit(pdf_page_count, content).result(timeout=self.timeout)
+        if self.max_pages:
+            pages = min(pages, self.max_pages)
+
+        step = max(self.pages_per_task, 1)
+        futures = [pool.submit(extract_pdf_pages, content, start, start + step) for start in range(0, pages, step)]
+        try:
+            parts = []
+            for future in futures:
+                parts.extend(future.result(timeout=max(deadline - time.monotonic(), 0)))
+        except (FutureTimeout, BrokenProcessPool, CancelledError):
+            for future in futures:
+                future.cancel()
+            raise
+
+        text = "\n".join(parts).strip()
+        return text if text else "Error: Empty PDF or unreadable."
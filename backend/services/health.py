@@ -0,0 +1,107 @@
+import time
+import asyncio
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitBreaker:
+    """
+    Classic closed -> open -> half-open breaker.
+
+    After `failure_threshold` consecutive failures the breaker opens and
+    allow() returns False until `reset_timeout` has passed; then a single
+    trial call is let through (half-open). Success closes it again.
+    """
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half-open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_in_flight = False
+
+    def release(self):
+        """Ends a half-open trial that was abandoned (cancelled) without an outcome."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self.failures >= self.failure_threshold or self.opened_at is not None:
+                self.opened_at = time.monotonic()
+
+
+class HealthProber:
+    """
+    Periodically runs registered health checks in the background so that
+    /status can answer from memory without doing any I/O.
+
+    A check is a blocking callable or a coroutine function; it returns optional
+    details and raises when the dependency is unavailable.
+    """
+
+    def __init__(self, interval: float = 15.0):
+        self.interval = interval
+        self.checks = {}
+        self.results = {}
+
+    def register(self, name: str, check):
+        self.checks[name] = check
+        self.results[name] = {"status": "unknown", "checked_at": None}
+
+    async def probe_once(self):
+        for name, check in self.checks.items():
+            started = time.monotonic()
+            try:
+                if asyncio.iscoroutinefunction(check):
+                    details = await check()
+                else:
+                    details = await asyncio.to_thread(check)
+                result = {"status": "online"}
+                if details:
+                    result["details"] = details
+            except Exception as e:
+                result = {"status": "offline/unavailable", "error": str(e)}
+            result["checked_at"] = time.time()
+            result["latency_ms"] = round((time.monotonic() - started) * 1000, 1)
+            self.results[name] = result
+
+    async def run(self):
+        while True:
+            try:
+                await self.probe_once()
+            except Exception as e:
+                logger.error(f"Health probe failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    def snapshot(self) -> dict:
+        return dict(self.results)
@@ -0,0 +1,130 @@
+import re
+from collections import Counter
+from backend.services.cache import content_hash
+from backend.services.keyword_index import tokenize
+
+MAX_KEYWORDS = 20
+
+# Bump when the extraction logic changes so cached JD analyses are re-derived
+JD_EXTRACTOR_VERSION = "4"
+
+DEFAULT_WEIGHTS = {"skills": 30, "experience": 30, "education": 15, "formatting": 10, "relevance": 15}
+
+STOPWORDS = set("""
+a about above after all also an and any are as at be been being both but by can could do does
+for from has have having he her his how i if in into is it its may more most must of on one or
+other our out over own per she should so some such than that the their them then there these they
+this those through to under up us very was we were what when where which while who will with
+within without would you your yours role team work working job candidate candidates position
+company join looking ability strong excellent good great plus preferred required requirements
+responsibilities responsible including etc new year years using use experience knowledge skills
+understanding familiarity hands least minimum ideal opportunity environment across well based
+need needs seeking want senior junior lead building build scale large apply bachelor master degree
+hiring hire hired design designing maintain maintaining collaborate collaborating collaboration
+deliver delivering develop developing implement implementing support supporting ensure ensuring
+drive driving owning partner partnering contribute contributing create creating improve
+improving manage managing help helping write writing mentor mentoring communicate communication
+reliable scalable robust high quality fast paced dynamic passionate motivated proven track record
+products product business solutions stakeholders cross functional analysts scientists engineers
+customers users teams day daily every key closely best practices
+""".split())
+
+EDUCATION_HINTS = re.compile(r"\b(degree|bachelor|master|phd|b\.?tech|b\.?sc|m\.?sc|graduate|diploma|certification)\b", re.I)
+EXPERIENCE_HINTS = re.compile(r"\b(\d+)\s*\+?\s*(?:years?|yrs?)\b", re.I)
+
+
+def jd_id_for(job_description: str) -> str:
+    return content_hash(" ".join(job_description.split()).lower())[:16]
+
+
+def extract_jd_role(job_description: str, catalog_index) -> dict:
+    """
+    Derives a role config (title, keywords, description, weights) from free text.
+
+    Catalog keywords found in the JD come first (they are the vocabulary the
+    rest of the scorer knows); the remaining slots go to the most frequent
+    non-stopword terms and bigrams of the JD itself. Only terms the JD repeats
+    qualify: a word mentioned once is usually prose, not a requirement, and
+    every extra keyword lowers each candidate's density and pads
+    missing_keywords.
+    """
+    scan = catalog_index.scan(job_description)
+    keywords = sorted(scan.counts, key=lambda k: (-scan.counts[k], k))
+
+    words = [t for t, _, _ in tokenize(job_description)]
+    unigrams = Counter(w for w in words if w not in STOPWORDS and len(w) > 2 and not any(c.isdigit() for c in w))
+    bigrams = Counter(
+        f"{a} {b}" for a, b in zip(words, words[1:])
+        if a not in STOPWORDS and b not in STOPWORDS and len(a) > 1 and len(b) > 1
+    )
+    # Repeated phrases first, then single terms; skip anything a chosen keyword already covers
+    candidates = [t for t, c in bigrams.most_common() if c >= 2] + [t for t, c in unigrams.most_common() if c >= 2]
+    covered = set(" ".join(keywords).split())
+    for term in candidates:
+        if len(keywords) >= MAX_KEYWORDS:
+            break
+        parts = term.split()
+        if term in keywords or all(p in covered for p in parts):
+            continue
+        keywords.append(term)
+        covered.update(parts)
+
+    weights = dict(DEFAULT_WEIGHTS)
+    if EDUCATION_HINTS.search(job_description):
+        weights["education"] += 5
+        weights["relevance"] -= 5
+    years = [int(y) for y in EXPERIENCE_HINTS.findall(job_description)]
+    if years and max(years) >= 3:
+        weights["experience"] += 10
+        weights["skills"] -= 5
+        weights["relevance"] -= 5
+
+    first_line = job_description.strip().splitlines()[0].strip() if job_description.strip() else ""
+    title = first_line if 0 < len(first_line) <= 80 else "Custom Role"
+
+    return {
+        "title": title,
+        "keywords": keywords,
+        "description": job_description.strip()[:500],
+        "weights": weights,
+    }
+
+
+class JobDescriptionAnalyzer:
+    """
+    Extracts a role config from a JD once and caches it by content hash (jd_id).
+
+    Extraction depends on the role catalog's keywords, so each entry records
+    the catalog version it was derived with and keeps the JD text. After a
+    catalog reload, a lookup re-derives the entry from that text, and
+    jd_ids handed out earlier keep working.
+    """
+
+    def __init__(self, catalog, cache):
+        self.catalog = catalog  # RoleCatalog; replaced on reload
+        self.cache = cache
+
+    def analyze(self, job_description: str) -> tuple:
+        jd_id = jd_id_for(job_description)
+        role_config = self.get(jd_id)
+        if role_config is None:
+            role_config = self._extract(jd_id, job_description)
+        return jd_id, role_config
+
+    def get(self, jd_id: str) -> dict:
+        entry = self.cache.get(f"{JD_EXTRACTOR_VERSION}:{jd_id}")
+        if entry is None:
+            return None
+        if entry["catalog_version"] != self.catalog.version:
+            return self._extract(jd_id, entry["job_description"])
+        return entry["role_config"]
+
+    def _extract(self, jd_id: str, job_description: str) -> dict:
+        catalog = self.catalog
+        role_config = extract_jd_role(job_description, catalog.index)
+        self.cache.set(f"{JD_EXTRACTOR_VERSION}:{jd_id}", {
+            "catalog_version": catalog.version,
+            "job_description": job_description,
+            "role_config": role_config,
+        })
+        return role_config
@@ -0,0 +1,222 @@
+import os
+import json
+import time
+import uuid
+import sqlite3
+import asyncio
+import logging
+import threading
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Priority lanes: lower runs first
+PRIORITIES = {"interactive": 0, "bulk": 1}
+
+TERMINAL_STATUSES = ("succeeded", "failed")
+
+
+def is_transient(error: BaseException) -> bool:
+    """Upstream/transport failures worth retrying; anything else (bad input, unknown role) fails at once."""
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code >= 500 or error.response.status_code == 429
+    return isinstance(error, (httpx.TransportError, TimeoutError, ConnectionError))
+
+
+class JobStore:
+    """SQLite-backed job records so queued and finished jobs survive restarts."""
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                priority INTEGER NOT NULL,
+                status TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                result TEXT,
+                error TEXT,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status)")
+        self._conn.commit()
+
+    def create(self, kind: str, payload: dict, priority: int) -> dict:
+        now = time.time()
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, kind, priority, status, payload, created_at, updated_at) "
+                "VALUES (?, ?, ?, 'queued', ?, ?, ?)",
+                (job_id, kind, priority, json.dumps(payload), now, now)
+            )
+            self._conn.commit()
+        return self.get(job_id)
+
+    def update(self, job_id: str, **fields):
+        if "result" in fields:
+            fields["result"] = json.dumps(fields["result"])
+        fields["updated_at"] = time.time()
+        columns = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock:
+            self._conn.execute(f"UPDATE jobs SET {columns} WHERE id = ?", (*fields.values(), job_id))
+            self._conn.commit()
+
+    def get(self, job_id: str, include_payload: bool = False) -> dict:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_dict(row, include_payload) if row else None
+
+    def pending(self) -> list:
+        """Jobs that were queued or mid-run when the process stopped."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM jobs WHERE status IN ('queued', 'running', 'retrying') ORDER BY priority, created_at"
+            ).fetchall()
+        return [self._to_dict(row, include_payload=True) for row in rows]
+
+    def purge(self, max_age: float) -> int:
+        """Deletes finished jobs last updated more than `max_age` seconds ago; returns how many."""
+        cutoff = time.time() - max_age
+        with self._lock:
+            cursor = self._conn.execute(
+                f"DELETE FROM jobs WHERE status IN ({', '.join('?' for _ in TERMINAL_STATUSES)}) AND updated_at < ?",
+                (*TERMINAL_STATUSES, cutoff)
+            )
+            self._conn.commit()
+        return cursor.rowcount
+
+    def counts(self) -> dict:
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {status: count for status, count in rows}
+
+    @staticmethod
+    def _to_dict(row, include_payload: bool) -> dict:
+        job = dict(row)
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        if include_payload:
+            job["payload"] = json.loads(job["payload"])
+        else:
+            job.pop("payload")
+        return job
+
+
+class JobQueue:
+    """
+    Local priority job queue: an asyncio.PriorityQueue drained by N worker tasks,
+    with every state change persisted to the JobStore.
+
+    Handlers are registered per job kind and receive the job payload. A handler
+    failing with an error `retryable` accepts (by default an upstream/transport
+    error) is retried with exponential backoff up to max_attempts; any other
+    error fails the job at once.
+    """
+
+    def __init__(self, store: JobStore, workers: int = 2, max_attempts: int = 3, retry_base_delay: float = 2.0,
+                 retryable=is_transient):
+        self.store = store
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.retry_base_delay = retry_base_delay
+        self.retryable = retryable
+        self.handlers = {}
+        self._queue = None
+        self._tasks = []
+        self._subscribers = {}  # job_id -> [asyncio.Queue]
+
+    def register(self, kind: str, handler):
+        self.handlers[kind] = handler
+
+    async def start(self):
+        self._queue = asyncio.PriorityQueue()
+        for job in self.store.pending():
+            self.store.update(job["id"], status="queued")
+            self._put(job)
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def submit(self, kind: str, payload: dict, priority: str = "interactive") -> dict:
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority: {priority}")
+        job = self.store.create(kind, payload, PRIORITIES[priority])
+        job["payload"] = payload
+        self._put(job)
+        return self.store.get(job["id"])
+
+    def get(self, job_id: str) -> dict:
+        return self.store.get(job_id)
+
+    def depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def events(self, job_id: str):
+        """Yields job snapshots on every state change until the job finishes."""
+        updates = asyncio.Queue()
+        self._subscribers.setdefault(job_id, []).append(updates)
+        try:
+            job = self.store.get(job_id)
+            while job is not None:
+                yield job
+                if job["status"] in TERMINAL_STATUSES:
+                    break
+                job = await updates.get()
+        finally:
+            self._subscribers[job_id].remove(updates)
+            if not self._subscribers[job_id]:
+                del self._subscribers[job_id]
+
+    def _put(self, job: dict):
+        self._queue.put_nowait((job["priority"], job["created_at"], job["id"], job["kind"], job["payload"]))
+
+    def _set(self, job_id: str, **fields):
+        self.store.update(job_id, **fields)
+        if job_id in self._subscribers:
+            snapshot = self.store.get(job_id)
+            for updates in self._subscribers[job_id]:
+                updates.put_nowait(snapshot)
+
+    async def _worker(self, n: int):
+        while True:
+            priority, created_at, job_id, kind, payload = await self._queue.get()
+            try:
+                await self._run(job_id, kind, payload, priority, created_at)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job_id, kind, payload, priority, created_at):
+        job = self.store.get(job_id)
+        attempts = job["attempts"] + 1
+        self._set(job_id, status="running", attempts=attempts)
+        try:
+            result = await self.handlers[kind](payload)
+        except asyncio.CancelledError:
+            self._set(job_id, status="queued")  # picked up again on next start
+            raise
+        except Exception as e:
+            if attempts < self.max_attempts and self.retryable(e):
+                delay = self.retry_base_delay * (2 ** (attempts - 1))
+                logger.warning(f"Job {job_id} attempt {attempts} failed ({e}); retrying in {delay:.1f}s")
+                self._set(job_id, status="retrying", error=str(e))
+                asyncio.get_running_loop().call_later(
+                    delay, self._queue.put_nowait, (priority, created_at, job_id, kind, payload)
+                )
+            else:
+                logger.error(f"Job {job_id} failed after {attempts} attempt(s): {e!r}")
+                self._set(job_id, status="failed", error=str(e))
+            return
+        self._set(job_id, status="succeeded", result=result, error=None)
@@ -0,0 +1,73 @@
+import json
+
+
+class IncrementalJSONObjectParser:
+    """
+    Incremental parser for a streamed top-level JSON object.
+
+    Feed it text chunks as they arrive from the LLM; each call returns the
+    (key, value) pairs of top-level fields that became complete in that chunk,
+    so e.g. "summary" can be shown before "section_scores" is generated.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.pos = 0
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+        self.key = None
+        self.key_start = None
+        self.value_start = None
+        self.done = False
+
+    def feed(self, chunk: str) -> list:
+        self.buffer += chunk
+        fields = []
+        buf = self.buffer
+
+        while self.pos < len(buf) and not self.done:
+            ch = buf[self.pos]
+
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif ch == "\\":
+                    self.escape = True
+                elif ch == '"':
+                    self.in_string = False
+                    if self.depth == 1 and self.key is None and self.key_start is not None:
+                        self.key = json.loads(buf[self.key_start:self.pos + 1])
+                        self.key_start = None
+                self.pos += 1
+                continue
+
+            if ch == '"':
+                self.in_string = True
+                if self.depth == 1 and self.key is None and self.value_start is None:
+                    self.key_start = self.pos
+            elif ch in "{[":
+                self.depth += 1
+            elif ch in "}]":
+                if self.depth == 1 and ch == "}":
+                    self._finish_value(buf, fields)
+                    self.done = True
+                self.depth -= 1
+            elif ch == ":" and self.depth == 1 and self.key is not None and self.value_start is None:
+                self.value_start = self.pos + 1
+            elif ch == "," and self.depth == 1:
+                self._finish_value(buf, fields)
+
+            self.pos += 1
+
+        return fields
+
+    def _finish_value(self, buf: str, fields: list):
+        if self.key is not None and self.value_start is not None:
+            raw = buf[self.value_start:self.pos].strip()
+            try:
+                fields.append((self.key, json.loads(raw)))
+            except ValueError:
+                pass  # malformed field; the final full parse decides what to do
+        self.key = None
+        self.value_start = None
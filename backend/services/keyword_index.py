@@ -0,0 +1,110 @@
+import re
+from collections import defaultdict
+from functools import lru_cache
+
+# Tokens are runs of letters/digits plus the few symbols that show up inside
+# tech names (c++, c#). Everything else is a boundary, so "nosql" is one token
+# and never matches "sql", and "build" never matches "ui". Matched
+# case-insensitively on the original text: lowercasing first can change its
+# length ("İ" -> "i" + combining dot) and shift every later offset.
+TOKEN_RE = re.compile(r"[a-z0-9+#]+", re.I)
+
+
+def _token(word: str) -> str:
+    lowered = word.lower()
+    return lowered if lowered.isascii() else "".join(TOKEN_RE.findall(lowered))
+
+
+def tokenize(text: str):
+    """Returns (lowercased token, start, end) tuples; offsets index `text` itself."""
+    return [(_token(m.group(0)), m.start(), m.end()) for m in TOKEN_RE.finditer(text)]
+
+
+class KeywordScan:
+    """Result of one pass of a KeywordIndex over a document."""
+
+    def __init__(self, counts: dict, spans: dict):
+        self.counts = counts  # keyword -> number of hits
+        self.spans = spans    # keyword -> [(start, end), ...] char offsets
+
+    def matched(self, keywords) -> list:
+        return [k for k in keywords if self.counts.get(k.lower(), 0) > 0]
+
+
+class KeywordIndex:
+    """
+    Token/phrase hash index over a set of keywords.
+
+    Keywords are split into token tuples and bucketed by their first token, so
+    a single walk over the resume tokens finds every hit for every keyword
+    (multi-word phrases such as "rest api" or "ci/cd" included).
+    """
+
+    def __init__(self, keywords):
+        self.phrases = defaultdict(list)  # first token -> [(token tuple, keyword)]
+        self.keywords = []
+        seen = set()
+        for keyword in keywords:
+            key = keyword.lower()
+            tokens = tuple(t for t, _, _ in tokenize(key))
+            if not tokens or key in seen:
+                continue
+            seen.add(key)
+            self.keywords.append(key)
+            self.phrases[tokens[0]].append((tokens, key))
+
+    def scan(self, text: str) -> KeywordScan:
+        tokens = tokenize(text)
+        words = [t for t, _, _ in tokens]
+        counts = {}
+        spans = defaultdict(list)
+
+        for i, word in enumerate(words):
+            candidates = self.phrases.get(word)
+            if not candidates:
+                continue
+            for phrase, key in candidates:
+                n = len(phrase)
+                if n == 1 or tuple(words[i:i + n]) == phrase:
+                    counts[key] = counts.get(key, 0) + 1
+                    spans[key].append((tokens[i][1], tokens[i + n - 1][2]))
+
+        return KeywordScan(counts, dict(spans))
+
+
+class RoleKeywordIndex(KeywordIndex):
+    """KeywordIndex over every role's keywords, keeping the keyword -> roles mapping."""
+
+    def __init__(self, roles: dict):
+        self.role_keywords = {}
+        all_keywords = []
+        for role_key, role in roles.items():
+            keys = list(dict.fromkeys(k.lower() for k in role.get("keywords", [])))
+            self.role_keywords[role_key] = keys
+            all_keywords.extend(keys)
+        super().__init__(all_keywords)
+
+    def role_scores(self, scan: KeywordScan) -> dict:
+        """Number of distinct keywords matched per role, in role order."""
+        return {
+            role_key: sum(1 for k in keys if scan.counts.get(k, 0) > 0)
+            for role_key, keys in self.role_keywords.items()
+        }
+
+    def role_density(self, scan: KeywordScan, role_key: str) -> float:
+        keys = self.role_keywords.get(role_key, [])
+        return density_from_scan(scan, keys)
+
+
+def density_from_scan(scan: KeywordScan, keywords) -> float:
+    total_keywords = len(keywords)
+    if total_keywords == 0:
+        return 0
+    matched = len(scan.matched(keywords))
+    return round((matched / total_keywords) * 100, 2)
+
+
+@lru_cache(maxsize=256)
+def compile_keywords(keywords: tuple) -> KeywordIndex:
+    """Cached index for an ad-hoc keyword list (e.g. a single role)."""
+    return KeywordIndex(keywords)
@@ -1,14 +1,36 @@
+from backend.services.keyword_index import compile_keywords, density_from_scan
+
+# A keyword mentioned this many times counts fully towards the weighted density
+FREQUENCY_CAP = 3
+
 def keyword_density_score(resume_text: str, keywords: list):
-    resume_text = resume_text.lower()
-    total_keywords = len(keywords)
-    matched = 0
+    # Word-boundary aware: "sql" does not match inside "nosql".
+    scan = compile_keywords(tuple(keywords)).scan(resume_text)
+    return density_from_scan(scan, keywords)
 
+def keyword_match(resume_text: str, keywords: list) -> dict:
+    """
+    Full deterministic keyword result from a single scan:
+    - score: matched/total density (same as keyword_density_score)
+    - weighted_score: density where each keyword counts min(hits, FREQUENCY_CAP)/FREQUENCY_CAP
+    - matched: [{"keyword", "count", "spans": [[start, end], ...]}] with character offsets
+    - missing: keywords with no hit, in role order
+    """
+    scan = compile_keywords(tuple(keywords)).scan(resume_text)
+    matched, missing = [], []
+    weighted = 0.0
     for keyword in keywords:
-        if keyword.lower() in resume_text:
-            matched += 1
-
-    if total_keywords == 0:
-        return 0
+        key = keyword.lower()
+        count = scan.counts.get(key, 0)
+        if count:
+            matched.append({"keyword": keyword, "count": count, "spans": [list(s) for s in scan.spans[key]]})
+            weighted += min(count, FREQUENCY_CAP) / FREQUENCY_CAP
+        else:
+            missing.append(keyword)
 
-    density = (matched / total_keywords) * 100
-    return round(density, 2)
+    return {
+        "score": density_from_scan(scan, keywords),
+        "weighted_score": round(weighted / len(keywords) * 100, 2) if keywords else 0,
+        "matched": matched,
+        "missing": missing,
+    }
@@ -0,0 +1,237 @@
+import re
+import json
+
+# field -> (expected type, default). Fields in REQUIRED_FIELDS are worth a
+# targeted re-prompt when missing; the rest fall back to their defaults.
+ANALYSIS_SCHEMA = {
+    "atsScore": (float, None),
+    "strengths": (list, []),
+    "weaknesses": (list, []),
+    "improvementSuggestions": (list, []),
+    "summary": (str, None),
+    "bestRole": (str, None),
+    "candidateName": (str, None),
+    "skills": (list, []),
+    "experienceHighlights": (list, []),
+    "education": (list, []),
+    "section_scores": (dict, {}),
+}
+REQUIRED_FIELDS = ("atsScore", "summary", "strengths", "weaknesses", "improvementSuggestions", "skills")
+# AnalysisResponse fields the server computes; never taken from the model's answer
+SERVER_FIELDS = (
+    "keyword_match_score", "final_ats_score", "role_weighted_score", "report_file", "report_url",
+    "missing_keywords", "matched_keywords", "keyword_weighted_score", "estimated", "features",
+)
+
+# Role-independent facts extracted once per resume (multi-role mode)
+PROFILE_SCHEMA = {
+    "candidateName": (str, None),
+    "summary": (str, None),
+    "skills": (list, []),
+    "experienceYears": (float, None),
+    "experienceHighlights": (list, []),
+    "education": (list, []),
+    "certifications": (list, []),
+    "section_scores": (dict, {}),
+}
+PROFILE_REQUIRED = ("summary", "skills", "experienceYears", "education")
+
+# Role-specific narrative, generated on request from a profile
+NARRATIVE_SCHEMA = {
+    "strengths": (list, []),
+    "weaknesses": (list, []),
+    "improvementSuggestions": (list, []),
+    "summary": (str, None),
+}
+NARRATIVE_REQUIRED = ("strengths", "weaknesses", "improvementSuggestions")
+
+FIELD_HINTS = {
+    "atsScore": "<number 0-100>",
+    "strengths": '["<strength>", ...]',
+    "weaknesses": '["<weakness>", ...]',
+    "improvementSuggestions": '["<improvement>", ...]',
+    "summary": '"<summary of candidate>"',
+    "skills": '["<skill>", ...]',
+    "experienceYears": "<total years of professional experience>",
+    "education": '["<degree, institution>", ...]',
+}
+
+FENCE_RE = re.compile(r"```(?:json)?\s*(.*?)```", re.S | re.I)
+TRAILING_COMMA_RE = re.compile(r",\s*([}\]])")
+UNQUOTED_KEY_RE = re.compile(r'([{,]\s*)([A-Za-z_][A-Za-z0-9_]*)\s*:')
+PY_LITERALS = {"True": "true", "False": "false", "None": "null"}
+SMART_QUOTES = str.maketrans({"“": '"', "”": '"', "‘": "'", "’": "'"})
+NUMBER_RE = re.compile(r"-?\d+(?:\.\d+)?")
+
+
+class ParsedOutput:
+    """Result of parsing one model answer against ANALYSIS_SCHEMA."""
+
+    def __init__(self, data: dict, missing: list, repaired: bool, found_json: bool):
+        self.data = data
+        self.missing = missing
+        self.repaired = repaired
+        self.found_json = found_json
+
+    @property
+    def complete(self) -> bool:
+        return not self.missing
+
+
+def extract_object(text: str) -> tuple:
+    """
+    (object text, truncated) for the first top-level {...} in the answer,
+    skipping code fences and prose around it. An object cut off mid-way
+    (generation limit) is closed: open strings, arrays and objects.
+    """
+    fenced = FENCE_RE.search(text)
+    if fenced:
+        text = fenced.group(1)
+    start = text.find("{")
+    if start < 0:
+        return None, False
+
+    stack, in_string, escape = [], False, False
+    for i in range(start, len(text)):
+        ch = text[i]
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch in "{[":
+            stack.append("}" if ch == "{" else "]")
+        elif ch in "}]":
+            if stack:
+                stack.pop()
+            if not stack:
+                return text[start:i + 1], False
+
+    fragment = text[start:].rstrip()
+    if in_string:
+        fragment += '"'
+    # Drop a dangling key or separator ("key": / ,) before closing
+    fragment = re.sub(r'(,\s*"[^"]*"\s*:?\s*|,\s*|:\s*)$', "", fragment)
+    return fragment + "".join(reversed(stack)), True
+
+
+def _repairs(candidate: str):
+    """Progressively more aggressive fixes for common model JSON defects."""
+    yield candidate
+    fixed = candidate.translate(SMART_QUOTES)
+    fixed = re.sub(r"//[^\n\"]*$", "", fixed, flags=re.M)  # line comments
+    fixed = TRAILING_COMMA_RE.sub(r"\1", fixed)
+    yield fixed
+    fixed = re.sub(r"\b(True|False|None)\b", lambda m: PY_LITERALS[m.group(1)], fixed)
+    yield UNQUOTED_KEY_RE.sub(r'\1"\2":', fixed)
+    if '"' not in fixed:
+        # Python-style single-quoted strings; checked before keys get quoted, which adds double quotes
+        yield UNQUOTED_KEY_RE.sub(r'\1"\2":', fixed.replace("'", '"'))
+
+
+def loads_lenient(text: str) -> tuple:
+    """(dict or None, repaired) from a model answer."""
+    candidate, truncated = extract_object(text)
+    if candidate is None:
+        return None, False
+    for attempt, fixed in enumerate(_repairs(candidate)):
+        try:
+            data = json.loads(fixed)
+        except ValueError:
+            continue
+        if isinstance(data, dict):
+            return data, truncated or attempt > 0 or candidate != text.strip()
+    return None, False
+
+
+def _coerce(value, expected):
+    """Value converted to the schema type, or None if it cannot be."""
+    if expected is float:
+        if isinstance(value, bool):
+            return None
+        if isinstance(value, (int, float)):
+            return float(min(max(value, 0), 100))
+        if isinstance(value, str):
+            # "85", "85/100", "Score: 85%"
+            match = NUMBER_RE.search(value)
+            return float(min(max(float(match.group()), 0), 100)) if match else None
+        return None
+    if expected is list:
+        if isinstance(value, list):
+            return value
+        if isinstance(value, str) and value.strip():
+            return [part.strip(" -•") for part in re.split(r"\n|;", value) if part.strip(" -•")]
+        return None
+    if expected is str:
+        if isinstance(value, str):
+            return value
+        if isinstance(value, (list, tuple)):
+            return " ".join(str(v) for v in value)
+        return None if value is None else str(value)
+    if expected is dict:
+        return value if isinstance(value, dict) else None
+    return value
+
+
+def parse_analysis(content, fields=None) -> ParsedOutput:
+    """
+    Parses an analysis answer (text or dict) against the schema.
+
+    Fields that are absent or cannot be coerced are listed in `missing` if
+    they are required (and in `fields`, when given); others get defaults.
+    Prose without any JSON becomes the summary.
+    """
+    return parse_output(content, ANALYSIS_SCHEMA, REQUIRED_FIELDS, fields, reserved=SERVER_FIELDS)
+
+
+def parse_profile(content, fields=None) -> ParsedOutput:
+    return parse_output(content, PROFILE_SCHEMA, PROFILE_REQUIRED, fields)
+
+
+def parse_narrative(content, fields=None) -> ParsedOutput:
+    return parse_output(content, NARRATIVE_SCHEMA, NARRATIVE_REQUIRED, fields)
+
+
+def parse_output(content, schema: dict, required: tuple, fields=None, reserved: tuple = ()) -> ParsedOutput:
+    """parse_analysis for any schema of field -> (type, default). Keys in `reserved` are dropped."""
+    fields = tuple(fields or schema)
+    if isinstance(content, dict):
+        raw, repaired, found = content, False, True
+    else:
+        raw, repaired = loads_lenient(content or "")
+        found = raw is not None
+        if raw is None:
+            prose = (content or "").strip()
+            raw = {"summary": prose[:2000]} if prose else {}
+
+    data, missing = {}, []
+    for field in fields:
+        expected, default = schema[field]
+        value = _coerce(raw[field], expected) if field in raw else None
+        if value is None:
+            if field in required:
+                missing.append(field)
+                continue
+            value = default
+        elif field in raw and not isinstance(raw[field], expected if expected is not float else (int, float)):
+            repaired = True
+        if value is not None:
+            data[field] = value
+    # Keep anything else the model added; the response model ignores unknown keys
+    for key, value in raw.items():
+        if key not in schema and key not in reserved:
+            data.setdefault(key, value)
+    return ParsedOutput(data, missing, repaired, found)
+
+
+def repair_prompt(missing: list) -> str:
+    """Follow-up turn asking only for the missing fields."""
+    template = ", ".join(f'"{field}": {FIELD_HINTS.get(field, "...")}' for field in missing)
+    return (
+        "Your previous answer was missing or had invalid values for: " + ", ".join(missing) + ". "
+        "Return ONLY a JSON object with exactly these keys: {" + template + "}"
+    )
@@ -0,0 +1,238 @@
+import json
+import time
+import asyncio
+import logging
+import httpx
+from contextlib import asynccontextmanager
+from backend.services.health import CircuitBreaker
+
+logger = logging.getLogger(__name__)
+
+
+def parse_backends(spec: str) -> list:
+    """
+    "http://a:11434, openai=http://b:8000" -> [("ollama", "http://a:11434"), ("openai", "http://b:8000")].
+    Entries without a prefix are Ollama servers.
+    """
+    backends = []
+    for entry in spec.split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        kind, sep, url = entry.partition("=")
+        if not sep:
+            kind, url = "ollama", entry
+        kind = kind.strip().lower()
+        if kind not in ("ollama", "openai"):
+            raise ValueError(f"Unknown LLM backend type '{kind}' in '{entry}'")
+        backends.append((kind, url.strip().rstrip("/")))
+    return backends
+
+
+class NoBackendAvailable(RuntimeError):
+    """Every backend is excluded or has an open breaker."""
+
+
+def is_server_failure(error: Exception) -> bool:
+    """True for errors that say the backend is unhealthy: no connection, timeout or a 5xx answer."""
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code >= 500
+    return isinstance(error, httpx.TransportError)
+
+
+class LLMBackend:
+    """
+    One model server: Ollama (/api/chat) or an OpenAI-compatible server
+    (/v1/chat/completions, e.g. llama.cpp, vLLM, LM Studio).
+
+    Tracks outstanding requests (queued + generating) and a moving average
+    of generation time, which the router uses for balancing and failover.
+    The fallback model has its own `fallback_concurrency` slots, so a
+    request diverted to it never waits behind the primary model's queue.
+    """
+
+    def __init__(self, url: str, kind: str = "ollama", max_concurrency: int = 2, breaker: CircuitBreaker = None,
+                 fallback_concurrency: int = 1):
+        self.url = url.rstrip("/")
+        self.kind = kind
+        self.max_concurrency = max_concurrency
+        self.fallback_concurrency = fallback_concurrency
+        self.breaker = breaker or CircuitBreaker()
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.fallback_semaphore = asyncio.Semaphore(max(fallback_concurrency, 1))
+        self.outstanding = 0
+        self.fallback_outstanding = 0
+        self.service_time = None  # EWMA seconds per generation
+        self.requests = 0
+        self.failures = 0
+
+    @property
+    def chat_url(self) -> str:
+        if self.kind == "openai":
+            return f"{self.url}/v1/chat/completions"
+        return f"{self.url}/api/chat"
+
+    @property
+    def probe_url(self) -> str:
+        return f"{self.url}/v1/models" if self.kind == "openai" else self.url
+
+    def estimated_wait(self) -> float:
+        """Seconds a new request would queue before a generation slot frees up."""
+        ahead = self.outstanding + 1 - self.max_concurrency
+        if ahead <= 0 or not self.service_time:
+            return 0.0
+        return ahead / self.max_concurrency * self.service_time
+
+    def load(self) -> float:
+        return self.outstanding / self.max_concurrency
+
+    def fallback_free(self) -> bool:
+        return self.fallback_outstanding < self.fallback_concurrency
+
+    def body(self, model: str, messages: list, stream: bool) -> dict:
+        if self.kind == "openai":
+            return {
+                "model": model,
+                "messages": messages,
+                "stream": stream,
+                "response_format": {"type": "json_object"},
+            }
+        return {"model": model, "messages": messages, "stream": stream, "format": "json"}
+
+    def content(self, data: dict) -> str:
+        if self.kind == "openai":
+            return data["choices"][0]["message"]["content"]
+        return data["message"]["content"]
+
+    def stream_chunk(self, line: str) -> tuple:
+        """(text, done) for one line of a streamed response."""
+        if self.kind == "openai":
+            if not line.startswith("data:"):
+                return "", False
+            data = line[5:].strip()
+            if data == "[DONE]":
+                return "", True
+            choice = json.loads(data)["choices"][0]
+            return choice.get("delta", {}).get("content") or "", choice.get("finish_reason") is not None
+        message = json.loads(line)
+        return message.get("message", {}).get("content", ""), bool(message.get("done"))
+
+    def _observe(self, seconds: float):
+        self.service_time = seconds if self.service_time is None else 0.8 * self.service_time + 0.2 * seconds
+
+    def snapshot(self) -> dict:
+        return {
+            "url": self.url,
+            "type": self.kind,
+            "outstanding": self.outstanding,
+            "max_concurrency": self.max_concurrency,
+            "fallback_outstanding": self.fallback_outstanding,
+            "fallback_concurrency": self.fallback_concurrency,
+            "avg_generation_s": round(self.service_time, 2) if self.service_time else None,
+            "estimated_wait_s": round(self.estimated_wait(), 2),
+            "requests": self.requests,
+            "failures": self.failures,
+            "breaker": self.breaker.state,
+        }
+
+
+class LLMRouter:
+    """
+    Spreads generations over several backends.
+
+    - Least outstanding requests (relative to each server's slot count) wins.
+    - Backends whose breaker is open are skipped; a failed call is retried
+      once on another backend by the caller.
+    - If even the least loaded backend would queue longer than
+      `fallback_wait` seconds and that backend has a free fallback slot, the
+      request goes to `fallback_model` instead (otherwise it queues as usual).
+    - Only connection errors, timeouts and 5xx answers count against a
+      backend's breaker; a 4xx means the server is up and rejected the request.
+    - The model per role comes from the role config's "model" key, then
+      `role_models` (keyed by role title), then the default model.
+    """
+
+    def __init__(self, backends: list, model: str, fallback_model: str = None,
+                 fallback_wait: float = 0.0, role_models: dict = None):
+        if not backends:
+            raise ValueError("At least one LLM backend is required")
+        self.backends = backends
+        self.model = model
+        self.fallback_model = fallback_model or None
+        self.fallback_wait = fallback_wait
+        self.role_models = role_models or {}
+        self.fallbacks = 0
+
+    def model_for(self, role_config: dict) -> str:
+        return role_config.get("model") or self.role_models.get(role_config.get("title")) or self.model
+
+    def select(self, exclude=()) -> LLMBackend:
+        candidates = [b for b in self.backends if b not in exclude and b.breaker.state != "open"]
+        for backend in sorted(candidates, key=lambda b: (b.load(), b.estimated_wait())):
+            # allow() claims the single half-open trial slot, so only ask the backend we would use
+            if backend.breaker.allow():
+                return backend
+        raise NoBackendAvailable("No LLM backend available")
+
+    def route(self, model: str, exclude=()) -> tuple:
+        backend = self.select(exclude)
+        if (self.fallback_model and model != self.fallback_model and backend.fallback_free()
+                and backend.estimated_wait() > self.fallback_wait):
+            logger.info(
+                f"{backend.url} queue ~{backend.estimated_wait():.1f}s, using fallback model {self.fallback_model}"
+            )
+            self.fallbacks += 1
+            return backend, self.fallback_model
+        return backend, model
+
+    def is_fallback(self, model: str) -> bool:
+        return bool(self.fallback_model) and model == self.fallback_model
+
+    @asynccontextmanager
+    async def slot(self, backend: LLMBackend, model: str = None):
+        """
+        Holds one generation slot on the backend (a fallback slot for the
+        fallback model) and records the outcome. Only primary-model calls feed
+        the backend's service time, which estimated_wait() is about.
+        """
+        fallback = self.is_fallback(model)
+        if fallback:
+            backend.fallback_outstanding += 1
+        else:
+            backend.outstanding += 1
+        backend.requests += 1
+        try:
+            async with backend.fallback_semaphore if fallback else backend.semaphore:
+                started = time.monotonic()
+                try:
+                    yield backend
+                except Exception as e:
+                    backend.failures += 1
+                    if is_server_failure(e):
+                        backend.breaker.record_failure()
+                    else:
+                        # 4xx / bad request: the server answered, so it is up
+                        backend.breaker.record_success()
+                    raise
+                except BaseException:
+                    # Cancelled / stream closed by the consumer: no verdict on the server
+                    backend.breaker.release()
+                    raise
+                if not fallback:
+                    backend._observe(time.monotonic() - started)
+                backend.breaker.record_success()
+        finally:
+            if fallback:
+                backend.fallback_outstanding -= 1
+            else:
+                backend.outstanding -= 1
+
+    def snapshot(self) -> dict:
+        return {
+            "model": self.model,
+            "fallback_model": self.fallback_model,
+            "fallback_wait_s": self.fallback_wait,
+            "fallbacks": self.fallbacks,
+            "role_models": self.role_models,
+            "backends": [b.snapshot() for b in self.backends],
+        }
@@ -0,0 +1,266 @@
+import sys
+import time
+import threading
+import contextvars
+from collections import Counter as _Counter
+from contextlib import contextmanager
+
+# Seconds; spans in-process scoring (sub-ms) up to slow LLM generations
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _label_str(labelnames: tuple, values: tuple, extra: str = "") -> str:
+    parts = [f'{k}="{_escape(v)}"' for k, v in zip(labelnames, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: tuple = ()):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = tuple(labels.get(k, "") for k in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_label_str(self.labelnames, key)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}  # labels -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(labels.get(k, "") for k in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                for bound, count in zip(self.buckets, series):
+                    le = 'le="%s"' % bound
+                    lines.append(f"{self.name}_bucket{_label_str(self.labelnames, key, le)} {count}")
+                le = 'le="+Inf"'
+                lines.append(f"{self.name}_bucket{_label_str(self.labelnames, key, le)} {series[-1]}")
+                lines.append(f"{self.name}_sum{_label_str(self.labelnames, key)} {round(series[-2], 6)}")
+                lines.append(f"{self.name}_count{_label_str(self.labelnames, key)} {series[-1]}")
+        return lines
+
+
+class CallbackMetric:
+    """
+    Value read at scrape time from state kept elsewhere (cache stats, queue
+    depth): callback() returns a number or {label value: number}.
+    """
+
+    def __init__(self, name: str, help: str, callback, labelname: str = None, kind: str = "gauge"):
+        self.name, self.help, self.callback, self.labelname, self.kind = name, help, callback, labelname, kind
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        try:
+            value = self.callback()
+        except Exception:
+            return lines
+        if isinstance(value, dict):
+            for label, v in sorted(value.items()):
+                lines.append(f'{self.name}{{{self.labelname}="{_escape(label)}"}} {v}')
+        elif value is not None:
+            lines.append(f"{self.name} {value}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+STAGE_SECONDS = REGISTRY.register(Histogram(
+    "ats_stage_duration_seconds", "Time spent in each processing stage.", ("stage",)
+))
+REQUEST_SECONDS = REGISTRY.register(Histogram(
+    "ats_http_request_duration_seconds", "HTTP request latency until the response starts.", ("method", "route", "status")
+))
+UPSTREAM_ERRORS = REGISTRY.register(Counter(
+    "ats_upstream_errors_total", "Failed calls to upstream services.", ("upstream", "reason")
+))
+LLM_OUTPUTS = REGISTRY.register(Counter(
+    "ats_llm_outputs_total", "LLM answers by parse outcome (clean, repaired, retries, retry_recovered, incomplete).",
+    ("outcome",)
+))
+SCORE_ESTIMATES = REGISTRY.register(Counter(
+    "ats_score_estimates_total", "Analyses answered with the deterministic estimate instead of the LLM.", ("reason",)
+))
+
+# Timings of the current request, for the Server-Timing header
+_request_stages = contextvars.ContextVar("request_stages", default=None)
+
+
+@contextmanager
+def stage(name: str):
+    """Times a block into ats_stage_duration_seconds and the request's Server-Timing entries."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        STAGE_SECONDS.observe(elapsed, stage=name)
+        stages = _request_stages.get()
+        if stages is not None:
+            stages.append((name, elapsed))
+
+
+def server_timing_header(stages: list, total: float) -> str:
+    """RFC-style Server-Timing value; repeated stages (e.g. per page) are summed."""
+    durations = {}
+    for name, elapsed in stages:
+        durations[name] = durations.get(name, 0.0) + elapsed
+    entries = [f"{name};dur={elapsed * 1000:.1f}" for name, elapsed in durations.items()]
+    entries.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(entries)
+
+
+class MetricsMiddleware:
+    """
+    Records request latency per route template and, when
+    settings["server_timing"] is on, adds a Server-Timing header with the
+    stages timed during the request. `settings` is shared with the app so the
+    header can be switched at runtime.
+    """
+
+    def __init__(self, app, settings: dict):
+        self.app = app
+        self.settings = settings
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        stages = []
+        token = _request_stages.set(stages)
+        started = time.perf_counter()
+
+        async def timed_send(message):
+            if message["type"] == "http.response.start":
+                elapsed = time.perf_counter() - started
+                route = scope.get("route")
+                REQUEST_SECONDS.observe(
+                    elapsed, method=scope["method"],
+                    route=getattr(route, "path", None) or "unmatched", status=message["status"]
+                )
+                if self.settings.get("server_timing"):
+                    header = server_timing_header(stages, elapsed).encode("latin-1")
+                    message = {**message, "headers": [*message.get("headers", []), (b"server-timing", header)]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, timed_send)
+        finally:
+            _request_stages.reset(token)
+
+
+class SamplingProfiler:
+    """
+    Low-overhead wall-clock profiler: a background thread snapshots every
+    thread's Python stack each `interval` seconds and counts identical stacks.
+    report() returns collapsed stacks ("frame;frame;frame count"), the input
+    format of flamegraph.pl / speedscope.
+    """
+
+    def __init__(self):
+        self.samples = _Counter()
+        self.interval = 0.01
+        self.started_at = None
+        self.stopped_at = None
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, interval: float = 0.01, duration: float = 60.0):
+        """Starts sampling (clearing earlier samples); stops by itself after `duration` seconds."""
+        if self.running:
+            raise RuntimeError("Profiler is already running")
+        self.samples = _Counter()
+        self.interval = max(interval, 0.001)
+        self.started_at, self.stopped_at = time.time(), None
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(duration,), name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self, duration: float):
+        own = threading.get_ident()
+        deadline = time.monotonic() + duration
+        while not self._stop.wait(self.interval) and time.monotonic() < deadline:
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({code.co_filename.rsplit('/', 1)[-1]}:{frame.f_lineno})")
+                    frame = frame.f_back
+                with self._lock:
+                    self.samples[";".join(reversed(stack))] += 1
+        self.stopped_at = time.time()
+
+    def status(self) -> dict:
+        return {
+            "running": self.running,
+            "interval_ms": round(self.interval * 1000, 2),
+            "started_at": self.started_at,
+            "stopped_at": self.stopped_at,
+            "samples": sum(self.samples.values()),
+        }
+
+    def report(self, limit: int = None) -> str:
+        with self._lock:
+            items = self.samples.most_common(limit)
+        return "\n".join(f"{stack} {count}" for stack, count in items) + "\n"
+
+
+PROFILER = SamplingProfiler()
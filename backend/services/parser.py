@@ -1,8 +1,37 @@
+import io
 import requests
+import hashlib
 import logging
+import itertools
+from requests.adapters import HTTPAdapter
+from backend.services.health import CircuitBreaker
+from backend.services.extraction import extract_local
+from backend.services.metrics import stage, UPSTREAM_ERRORS
 
 logger = logging.getLogger(__name__)
 
+CHUNK_SIZE = 1024 * 1024
+
+def file_digest(source) -> str:
+    """SHA-256 of bytes or a seekable binary file (read in chunks). None when empty."""
+    if isinstance(source, (bytes, bytearray)):
+        return hashlib.sha256(source).hexdigest() if source else None
+    h = hashlib.sha256()
+    size = 0
+    source.seek(0)
+    for chunk in iter(lambda: source.read(CHUNK_SIZE), b""):
+        h.update(chunk)
+        size += len(chunk)
+    source.seek(0)
+    return h.hexdigest() if size else None
+
+def as_stream(source):
+    """Binary stream positioned at the start, without copying when source already is a file."""
+    if isinstance(source, (bytes, bytearray)):
+        return io.BytesIO(source)
+    source.seek(0)
+    return source
+
 class TikaParser:
     """
     Parses resume content using Apache Tika first.
@@ -12,76 +41,153 @@ class TikaParser:
     1. Download Tika Server JAR: https://tika.apache.org/download.html
     2. Run it: `java -jar tika-server-standard-x.x.x.jar`
     3. Ensure it's listening on port 9998.
+
+    Several Tika servers can be given; requests round-robin across them over a
+    pooled keep-alive session. Each endpoint has a circuit breaker, so while
+    Tika is known to be down uploads go straight to local parsing instead of
+    waiting for a connection timeout.
     """
-    def __init__(self, tika_url="http://localhost:9998/tika"):
-        self.tika_url = tika_url
+    def __init__(self, tika_url="http://localhost:9998/tika", cache=None, extractor=None,
+                 timeout: float = 5.0, breaker_threshold: int = 3, breaker_reset: float = 30.0, pool_size: int = 10):
+        urls = [tika_url] if isinstance(tika_url, str) else list(tika_url)
+        self.tika_url = urls[0]
+        self.endpoints = [(url, CircuitBreaker(breaker_threshold, breaker_reset)) for url in urls]
+        self.timeout = timeout
+        self._next = itertools.count()
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=len(urls), pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        # Optional LocalExtractor (process pool) for the pypdf/docx2txt fallback
+        self.extractor = extractor
+        # Optional TieredCache: sha256(file bytes) -> {"text": ..., "parser": ...}
+        self.cache = cache
+
+    def parse_resume(self, file_content, filename: str = "resume.pdf") -> str:
+        return self.parse(file_content, filename)["text"]
+
+    def parse(self, file_content, filename: str = "resume.pdf", digest: str = None) -> dict:
+        """
+        Extracts text, returning {"text", "parser"}. Identical bytes are served from the cache.
+
+        file_content may be bytes or a seekable binary file (e.g. a spooled upload),
+        which is streamed to Tika instead of being loaded into memory.
+        """
+        key = digest or file_digest(file_content)
+        if self.cache is not None and key:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
 
-    def parse_resume(self, file_content: bytes, filename: str = "resume.pdf") -> str:
+        result = self._extract(file_content, filename)
+        # Don't pin failures; a later retry may succeed (e.g. once Tika is back)
+        if self.cache is not None and key and not result["text"].startswith("Error:"):
+            self.cache.set(key, result)
+        return result
+
+    def _available_endpoints(self) -> list:
+        """
+        Endpoints whose breaker is not open, starting at the round-robin
+        position. allow() is left to the caller, right before each attempt:
+        it claims a half-open breaker's single trial slot, so asking every
+        endpoint up front would lock out the ones never tried.
+        """
+        start = next(self._next) % len(self.endpoints)
+        rotated = self.endpoints[start:] + self.endpoints[:start]
+        return [(url, breaker) for url, breaker in rotated if breaker.state != "open"]
+
+    def _extract(self, file_content: bytes, filename: str) -> dict:
         # 1. Try Apache Tika (Best Quality)
-        try:
-            headers = {
-                "X-Tika-PDFextractInlineImages": "true",
-                "Accept": "text/plain"
-            }
-            # Determine mime type hint if possible, but Tika is good at detection
-            if filename.endswith(".pdf"):
-                headers["Content-Type"] = "application/pdf"
-            
-            response = requests.put(
-                self.tika_url,
-                data=file_content,
-                headers=headers,
-                timeout=5 # Short timeout to fail fast to fallback
-            )
-            response.raise_for_status()
-            text = response.text.strip()
-            if text:
-                return text
-        except requests.exceptions.RequestException:
-            logger.warning("Tika Service unavailable. Falling back to local parsers.")
+        headers = {
+            "X-Tika-PDFextractInlineImages": "true",
+            "Accept": "text/plain"
+        }
+        # Determine mime type hint if possible, but Tika is good at detection
+        if filename.endswith(".pdf"):
+            headers["Content-Type"] = "application/pdf"
+
+        tried = False
+        for url, breaker in self._available_endpoints():
+            if not breaker.allow():
+                continue  # half-open with its trial call already in flight
+            tried = True
+            try:
+                with stage("tika"):
+                    response = self.session.put(
+                        url,
+                        data=as_stream(file_content),
+                        headers=headers,
+                        timeout=self.timeout # Short timeout to fail fast to fallback
+                    )
+                response.raise_for_status()
+                breaker.record_success()
+                text = response.text.strip()
+                if text:
+                    return {"text": text, "parser": "tika"}
+                break
+            except requests.exceptions.HTTPError as e:
+                # Tika answered; a 4xx is about this document, not the server's health
+                if e.response is not None and e.response.status_code < 500:
+                    breaker.record_success()
+                    break
+                breaker.record_failure()
+                UPSTREAM_ERRORS.inc(upstream="tika", reason="http_5xx")
+            except requests.exceptions.RequestException as e:
+                breaker.record_failure()
+                UPSTREAM_ERRORS.inc(upstream="tika", reason="timeout" if isinstance(e, requests.exceptions.Timeout) else "unavailable")
+                logger.warning(f"Tika Service unavailable at {url}.")
+            except BaseException:
+                breaker.release()  # no verdict on the server (e.g. the upload stream failed)
+                raise
+        else:
+            if tried:
+                logger.warning("Tika Service unavailable. Falling back to local parsers.")
+            else:
+                logger.info("Tika circuit open. Using local parsers.")
 
         # 2. Fallback: Local Parsing
-        return self._local_fallback(file_content, filename)
+        with stage("local_extract"):
+            text = self._local_fallback(file_content, filename)
+        return {"text": text, "parser": self._fallback_name(filename)}
+
+    def probe(self) -> dict:
+        """
+        Health check for the background prober: pings every endpoint's /version,
+        feeding the result into its breaker. Raises if no endpoint is up.
+        """
+        results = {}
+        for url, breaker in self.endpoints:
+            version_url = url.rsplit("/tika", 1)[0] + "/version"
+            try:
+                self.session.get(version_url, timeout=2).raise_for_status()
+                breaker.record_success()
+                online = True
+            except requests.exceptions.RequestException:
+                breaker.record_failure()
+                online = False
+            results[url] = {"online": online, "breaker": breaker.state}
+        if not any(r["online"] for r in results.values()):
+            raise RuntimeError(f"No Tika endpoint available: {results}")
+        return results
+
+    @staticmethod
+    def _fallback_name(filename: str) -> str:
+        filename = filename.lower()
+        if filename.endswith(".pdf"):
+            return "pypdf"
+        if filename.endswith(".docx"):
+            return "docx2txt"
+        if filename.endswith(".txt"):
+            return "text"
+        return "none"
 
-    def _local_fallback(self, content: bytes, filename: str) -> str:
+    def _local_fallback(self, content, filename: str) -> str:
         try:
-            import io
-            filename = filename.lower()
-            
-            if filename.endswith(".pdf"):
-                from pypdf import PdfReader
-                reader = PdfReader(io.BytesIO(content))
-                text = ""
-                for page in reader.pages:
-                    text += page.extract_text() + "\n"
-                return text.strip() if text else "Error: Empty PDF or unreadable."
-
-            elif filename.endswith(".docx"):
-                import docx2txt
-                # docx2txt expects a file path or file-like object
-                # We need to write to temp or use io? docx2txt process args usually.
-                # Actually, python-docx is better but docx2txt is simpler for just text.
-                # Let's use a temporary file approach or a different lib if needed, 
-                # but docx2txt.process(file_obj) works? 
-                # Checking docx2txt signature: process(src) where src is path. 
-                # Let's use 'docx' (python-docx) for robust io support if docx2txt fails, 
-                # but let's try a workaround since we added docx2txt.
-                # Actually, let's write to a temp file safely.
-                import tempfile, os
-                with tempfile.NamedTemporaryFile(delete=False, suffix=".docx") as tmp:
-                    tmp.write(content)
-                    tmp_path = tmp.name
-                
-                try:
-                    text = docx2txt.process(tmp_path)
-                finally:
-                    os.remove(tmp_path)
-                return text
-
-            elif filename.endswith(".txt"):
-                return content.decode("utf-8", errors="ignore")
-
-            return "Error: Unsupported file format for local fallback. Please enable Tika."
+            # Worker processes need the raw bytes; only read them on the fallback path
+            data = content if isinstance(content, (bytes, bytearray)) else as_stream(content).read()
+            if self.extractor is not None:
+                return self.extractor.extract(bytes(data), filename)
+            return extract_local(bytes(data), filename)
 
         except Exception as e:
             logger.error(f"Fallback parsing failed: {e}")
@@ -0,0 +1,131 @@
+import re
+
+# Heading text -> section. Matched against short lines only.
+SECTION_HEADINGS = {
+    "skills": ("skills", "technical skills", "core competencies", "technologies", "tech stack", "tools"),
+    "experience": ("experience", "work experience", "professional experience", "employment", "work history", "internships"),
+    "projects": ("projects", "personal projects", "academic projects", "key projects"),
+    "education": ("education", "academic background", "qualifications", "academics"),
+    "summary": ("summary", "profile", "professional summary", "objective", "about me", "career objective"),
+    "certifications": ("certifications", "certificates", "licenses", "courses", "training"),
+    "publications": ("publications", "papers", "research", "patents", "talks", "presentations"),
+}
+
+# Which role weight each section serves; unlisted sections fall back to "relevance"
+SECTION_WEIGHT = {
+    "skills": "skills",
+    "experience": "experience",
+    "projects": "experience",
+    "education": "education",
+    "certifications": "education",
+    "summary": "relevance",
+}
+
+# Tika/pdf boilerplate that carries no signal. Bare numbers are page numbers
+# only up to 3 digits: a line like "2019" is a date the experience features need.
+NOISE_RE = re.compile(r"^(page\s*\d+(\s*(of|/)\s*\d+)?|\d{1,3}|curriculum vitae|resume|cv)$", re.I)
+
+HEADING_LOOKUP = {h: section for section, headings in SECTION_HEADINGS.items() for h in headings}
+
+# Bump when the compaction logic changes (part of the LLM cache key)
+COMPACTOR_VERSION = "2"
+
+
+def estimate_tokens(text: str) -> int:
+    # ~4 characters per token for English prose on llama-family tokenizers
+    return (len(text) + 3) // 4
+
+
+def _heading(line: str):
+    if len(line) > 40:
+        return None
+    key = re.sub(r"[^a-z ]", "", line.lower()).strip()
+    return HEADING_LOOKUP.get(key)
+
+
+def split_sections(lines: list) -> list:
+    """[(section, [lines])] in document order; text before the first heading is "header"."""
+    sections = [["header", []]]
+    for line in lines:
+        section = _heading(line)
+        if section:
+            sections.append([section, [line]])
+        else:
+            sections[-1][1].append(line)
+    return [(name, body) for name, body in sections if body]
+
+
+def clean_lines(text: str) -> list:
+    """Collapses whitespace, drops boilerplate and repeated lines (e.g. per-page headers)."""
+    seen = set()
+    lines = []
+    for raw in text.splitlines():
+        line = " ".join(raw.split())
+        if not line or NOISE_RE.match(line):
+            continue
+        key = line.lower()
+        if key in seen and _heading(line) is None:
+            continue
+        seen.add(key)
+        lines.append(line)
+    return lines
+
+
+def compact_resume(text: str, weights: dict = None, token_budget: int = 1500) -> tuple:
+    """
+    Fits a resume into `token_budget` tokens for the LLM prompt.
+
+    Sections are kept whole in order of importance for the role's weights
+    (the header with name/contact always first). A section that does not fit
+    keeps its leading lines, the last one truncated to the remaining budget;
+    lower-priority sections still get whatever budget is left. Output keeps
+    the original section order. Returns (text, stats).
+    """
+    weights = weights or {}
+    original_tokens = estimate_tokens(text)
+    lines = clean_lines(text)
+    sections = split_sections(lines)
+
+    def priority(item):
+        index, (name, _) = item
+        if name == "header":
+            return (0, 0, index)
+        if name == "publications":
+            return (2, 0, index)
+        return (1, -weights.get(SECTION_WEIGHT.get(name, "relevance"), 0), index)
+
+    budget = token_budget
+    kept = {}
+    for index, (name, body) in sorted(enumerate(sections), key=priority):
+        section_text = "\n".join(body)
+        cost = estimate_tokens(section_text) + 1
+        if cost <= budget:
+            kept[index] = body
+            budget -= cost
+            continue
+        # Partial fit: keep the leading lines (most recent roles / top skills come first)
+        partial = []
+        for line in body:
+            line_cost = estimate_tokens(line) + 1
+            if line_cost > budget:
+                # Cut the line rather than lose it (one-line Tika output is common)
+                chars = (budget - 1) * 4
+                if chars > 0:
+                    partial.append(line[:chars].rstrip())
+                    budget = 0
+                break
+            partial.append(line)
+            budget -= line_cost
+        if partial:
+            kept[index] = partial
+
+    compacted = "\n".join("\n".join(kept[i]) for i in sorted(kept))
+    compacted_tokens = estimate_tokens(compacted)
+    stats = {
+        "original_tokens": original_tokens,
+        "compacted_tokens": compacted_tokens,
+        "saved_tokens": max(original_tokens - compacted_tokens, 0),
+        "sections": [name for name, _ in sections],
+        "dropped_sections": [name for i, (name, _) in enumerate(sections) if i not in kept],
+    }
+    return compacted, stats
@@ -0,0 +1,190 @@
+import io
+import os
+import json
+import uuid
+import logging
+import zipfile
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from backend.services.report_generator import generate_ats_report
+from backend.services.metrics import stage
+
+logger = logging.getLogger(__name__)
+
+
+class ReportStore:
+    """
+    Stores report data at analysis time and renders the PDF only when needed.
+
+    Analyses call save() (a small JSON write); the PDF is rendered by render()
+    on first download and kept on disk for later requests. With eager=True
+    the render is kicked off on a background thread right after save().
+
+    Reports live in two-character shard directories (reports/ab/report_ab....pdf)
+    under full 128-bit IDs. gc() enforces max_age and max_bytes, evicting whole
+    reports (data + PDF) oldest first.
+    """
+
+    def __init__(self, directory: str = "reports", eager: bool = False, render_workers: int = 1,
+                 max_age: float = None, max_bytes: int = None):
+        self.directory = directory
+        self.eager = eager
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self.file_count = 0
+        self.bytes = 0
+        self.evictions = 0
+        self.last_gc = None
+        os.makedirs(directory, exist_ok=True)
+        self._render_locks = {}
+        self._guard = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=render_workers, thread_name_prefix="report") if eager else None
+
+    @staticmethod
+    def normalize_id(report_id: str) -> str:
+        # Accept legacy "report_<id>" file stems as well as bare IDs
+        return report_id[len("report_"):] if report_id.startswith("report_") else report_id
+
+    def _base(self, report_id: str) -> str:
+        report_id = self.normalize_id(report_id)
+        if not report_id.isalnum():
+            raise ValueError("Invalid report id")
+        if len(report_id) <= 8:
+            # Legacy short IDs were written flat into the reports directory
+            return os.path.join(self.directory, f"report_{report_id}")
+        return os.path.join(self.directory, report_id[:2], f"report_{report_id}")
+
+    def pdf_path(self, report_id: str) -> str:
+        return self._base(report_id) + ".pdf"
+
+    def data_path(self, report_id: str) -> str:
+        return self._base(report_id) + ".json"
+
+    @staticmethod
+    def url_for(report_id: str) -> str:
+        return f"/reports/{report_id}.pdf"
+
+    def save(self, report_data: dict) -> str:
+        report_id = uuid.uuid4().hex
+        data_path = self.data_path(report_id)
+        os.makedirs(os.path.dirname(data_path), exist_ok=True)
+        with open(data_path, "w", encoding="utf-8") as f:
+            json.dump(report_data, f)
+        self._count_file(data_path)
+        if self._executor is not None:
+            self._executor.submit(self._render_quietly, report_id)
+        return report_id
+
+    def exists(self, report_id: str) -> bool:
+        try:
+            return os.path.exists(self.pdf_path(report_id)) or os.path.exists(self.data_path(report_id))
+        except ValueError:
+            return False
+
+    def render(self, report_id: str) -> str:
+        """Returns the PDF path, rendering it first if this is the first request."""
+        pdf_path = self.pdf_path(report_id)
+        if os.path.exists(pdf_path):
+            return pdf_path
+
+        with self._guard:
+            lock = self._render_locks.setdefault(report_id, threading.Lock())
+        with lock:
+            if not os.path.exists(pdf_path):
+                with open(self.data_path(report_id), encoding="utf-8") as f:
+                    report_data = json.load(f)
+                # Render to a temp name so a concurrent reader never sees a half-written PDF
+                tmp_path = pdf_path + ".tmp"
+                with stage("generate_ats_report"):
+                    generate_ats_report(tmp_path, report_data)
+                os.replace(tmp_path, pdf_path)
+                self._count_file(pdf_path)
+        with self._guard:
+            self._render_locks.pop(report_id, None)
+        return pdf_path
+
+    def _count_file(self, path: str):
+        size = os.path.getsize(path)
+        with self._guard:
+            self.file_count += 1
+            self.bytes += size
+
+    def _render_quietly(self, report_id: str):
+        try:
+            self.render(report_id)
+        except Exception as e:
+            logger.error(f"Report generation failed: {e}")
+
+    def export_zip(self, report_ids) -> io.BytesIO:
+        """Renders (if needed) and bundles the given reports into one zip."""
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+            for report_id in report_ids:
+                if not self.exists(report_id):
+                    continue
+                path = self.render(report_id)
+                zf.write(path, arcname=os.path.basename(path))
+        buffer.seek(0)
+        return buffer
+
+    def _scan(self) -> dict:
+        """Groups every stored file by report stem: stem -> [(path, size, mtime)]."""
+        reports = {}
+        stack = [self.directory]
+        while stack:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.name.startswith("report_"):
+                        stem = entry.name.split(".", 1)[0]
+                        st = entry.stat()
+                        reports.setdefault(stem, []).append((entry.path, st.st_size, st.st_mtime))
+        return reports
+
+    def gc(self) -> dict:
+        """Deletes reports past max_age, then the oldest ones until under max_bytes."""
+        now = time.time()
+        reports = self._scan()
+        # Oldest first, by the newest file of each report (a fresh render keeps it alive)
+        ordered = sorted(reports.items(), key=lambda item: max(mtime for _, _, mtime in item[1]))
+        total = sum(size for files in reports.values() for _, size, _ in files)
+        count = sum(len(files) for files in reports.values())
+        evicted = 0
+
+        for stem, files in ordered:
+            newest = max(mtime for _, _, mtime in files)
+            expired = self.max_age is not None and now - newest > self.max_age
+            over_quota = self.max_bytes is not None and total > self.max_bytes
+            if not (expired or over_quota):
+                break
+            for path, size, _ in files:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+                count -= 1
+            evicted += 1
+
+        with self._guard:
+            self.file_count = count
+            self.bytes = total
+        self.evictions += evicted
+        self.last_gc = now
+        if evicted:
+            logger.info(f"Report GC evicted {evicted} reports")
+        return self.stats()
+
+    def stats(self) -> dict:
+        # Recounted by every GC scan and kept current by save()/render() in between,
+        # to avoid listing the tree per call
+        return {
+            "file_count": self.file_count,
+            "bytes": self.bytes,
+            "evictions": self.evictions,
+            "max_age": self.max_age,
+            "max_bytes": self.max_bytes,
+            "last_gc": self.last_gc,
+        }
@@ -0,0 +1,281 @@
+import os
+import re
+import json
+import time
+import hashlib
+import asyncio
+import logging
+import threading
+from collections.abc import Mapping
+from backend.services.keyword_index import RoleKeywordIndex, compile_keywords, tokenize
+
+logger = logging.getLogger(__name__)
+
+WEIGHT_KEYS = ("skills", "experience", "education", "formatting", "relevance")
+ROLE_ID_RE = re.compile(r"^[a-z0-9_]+$")
+
+
+class RoleCatalogError(ValueError):
+    """The role file cannot be read or does not describe a valid catalog."""
+
+
+class FrozenDict(dict):
+    """
+    dict that refuses mutation; still a dict for json.dumps, isinstance checks and .get().
+
+    copy.deepcopy() returns a plain, mutable dict/list copy (for callers that
+    want to tweak a role config); pickling round-trips to a FrozenDict.
+    """
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("Role catalog entries are read-only")
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __reduce__(self):
+        # The default dict-subclass protocol refills the copy through __setitem__
+        return self.__class__, (dict(self),)
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return thaw(self)
+
+
+def freeze(value):
+    if isinstance(value, dict):
+        return FrozenDict((k, freeze(v)) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+def thaw(value):
+    """Mutable deep copy of a frozen value: FrozenDicts become dicts, tuples become lists."""
+    if isinstance(value, dict):
+        return {k: thaw(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [thaw(v) for v in value]
+    return value
+
+
+def load_role_file(path: str) -> dict:
+    """Role id -> role config from a JSON file, or YAML (.yaml/.yml, needs PyYAML)."""
+    is_yaml = path.endswith((".yaml", ".yml"))
+    if is_yaml:
+        try:
+            import yaml
+        except ImportError:
+            raise RoleCatalogError("PyYAML is required for a YAML role catalog")
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return yaml.safe_load(f) if is_yaml else json.load(f)
+    except Exception as e:  # OSError, JSONDecodeError, yaml.YAMLError
+        raise RoleCatalogError(f"Cannot read role catalog {path}: {e}")
+
+
+def validate_roles(data) -> list:
+    """Every problem found in a catalog (empty when valid)."""
+    if not isinstance(data, dict) or not data:
+        return ["Catalog must be a non-empty mapping of role id -> role"]
+    errors = []
+    for role_id, role in data.items():
+        where = f"roles.{role_id}"
+        if not isinstance(role_id, str) or not ROLE_ID_RE.match(role_id):
+            errors.append(f"{where}: role id must be lowercase letters, digits and underscores")
+        if not isinstance(role, dict):
+            errors.append(f"{where}: must be a mapping")
+            continue
+        unknown = set(role) - {"title", "keywords", "description", "weights", "model"}
+        if unknown:
+            errors.append(f"{where}: unknown fields {sorted(unknown)}")
+        if not isinstance(role.get("title"), str) or not role["title"].strip():
+            errors.append(f"{where}.title: required non-empty string")
+        if not isinstance(role.get("description", ""), str):
+            errors.append(f"{where}.description: must be a string")
+        if "model" in role and (not isinstance(role["model"], str) or not role["model"].strip()):
+            errors.append(f"{where}.model: must be a non-empty model name (LLM used for this role)")
+
+        keywords = role.get("keywords")
+        if not isinstance(keywords, list) or not keywords:
+            errors.append(f"{where}.keywords: required non-empty list")
+        else:
+            seen = set()
+            for keyword in keywords:
+                if not isinstance(keyword, str) or not tokenize(keyword):
+                    errors.append(f"{where}.keywords: {keyword!r} has no matchable word")
+                elif keyword.lower() in seen:
+                    errors.append(f"{where}.keywords: duplicate {keyword!r}")
+                else:
+                    seen.add(keyword.lower())
+
+        weights = role.get("weights")
+        if not isinstance(weights, dict) or not weights:
+            errors.append(f"{where}.weights: required mapping of {', '.join(WEIGHT_KEYS)}")
+            continue
+        valid = True
+        for key, value in weights.items():
+            if key not in WEIGHT_KEYS:
+                errors.append(f"{where}.weights: unknown section {key!r}")
+                valid = False
+            elif isinstance(value, bool) or not isinstance(value, (int, float)) or value < 0:
+                errors.append(f"{where}.weights.{key}: must be a number >= 0")
+                valid = False
+        if valid and sum(weights.values()) <= 0:
+            errors.append(f"{where}.weights: at least one weight must be positive")
+    return errors
+
+
+class CompiledRole:
+    """Everything derived from one role config, computed once per catalog load."""
+
+    __slots__ = ("role_id", "config", "keywords", "keyword_set", "matcher", "weights")
+
+    def __init__(self, role_id: str, config: FrozenDict):
+        self.role_id = role_id
+        self.config = config
+        self.keywords = tuple(dict.fromkeys(k.lower() for k in config["keywords"]))
+        self.keyword_set = frozenset(self.keywords)
+        # Same object keyword_match() gets from compile_keywords for this role
+        self.matcher = compile_keywords(tuple(config["keywords"]))
+        total = sum(config["weights"].values())
+        self.weights = FrozenDict((k, config["weights"].get(k, 0) / total) for k in WEIGHT_KEYS)
+
+
+class RoleCatalog:
+    """
+    Validated, immutable role catalog.
+
+    Role configs are FrozenDicts with tuple keyword lists. Keyword sets,
+    matchers, normalized weights, the all-roles keyword index and the
+    /roles response body are built once here. `version` is a content hash,
+    so two loads of the same roles compare equal whatever the file layout.
+    """
+
+    def __init__(self, roles: dict, source: str = None):
+        errors = validate_roles(roles)
+        if errors:
+            raise RoleCatalogError(f"Invalid role catalog{f' {source}' if source else ''}: " + "; ".join(errors))
+        self.source = source
+        self.roles = freeze(roles)
+        self.compiled = {role_id: CompiledRole(role_id, config) for role_id, config in self.roles.items()}
+        self.index = RoleKeywordIndex(self.roles)
+        self.body = json.dumps(self.roles, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        self.version = hashlib.sha256(
+            json.dumps(self.roles, sort_keys=True, separators=(",", ":")).encode("utf-8")
+        ).hexdigest()[:16]
+        self.etag = f'"{self.version}"'
+        self.loaded_at = time.time()
+
+    @classmethod
+    def from_file(cls, path: str) -> "RoleCatalog":
+        return cls(load_role_file(path), source=path)
+
+    def get(self, role_id: str, default=None):
+        return self.roles.get(role_id, default)
+
+    def not_modified(self, if_none_match: str) -> bool:
+        """True if an If-None-Match header value matches this version's ETag."""
+        if not if_none_match:
+            return False
+        tags = [t.strip().removeprefix("W/") for t in if_none_match.split(",")]
+        return "*" in tags or self.etag in tags
+
+
+class RoleCatalogStore:
+    """
+    Holds the current RoleCatalog and reloads it when the file changes.
+
+    run() polls the file's mtime/size every `interval` seconds. A changed
+    file that fails validation is logged and the previous catalog stays in
+    service. Listeners registered with subscribe() are called with the new
+    catalog after each successful reload that changed the version.
+    """
+
+    def __init__(self, path: str, interval: float = 5.0):
+        self.path = path
+        self.interval = interval
+        self.listeners = []
+        self.last_error = None
+        self.reloads = 0
+        self._lock = threading.Lock()
+        self._stamp = self._file_stamp()
+        self._catalog = RoleCatalog.from_file(path)
+
+    @property
+    def current(self) -> RoleCatalog:
+        return self._catalog
+
+    def subscribe(self, listener):
+        self.listeners.append(listener)
+
+    def _file_stamp(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def reload(self, force: bool = False) -> bool:
+        """Loads the file if it changed (or `force`); True when a new version was installed."""
+        with self._lock:
+            stamp = self._file_stamp()
+            if stamp is None or (stamp == self._stamp and not force):
+                return False
+            self._stamp = stamp
+            try:
+                catalog = RoleCatalog.from_file(self.path)
+            except RoleCatalogError as e:
+                self.last_error = str(e)
+                logger.error(f"Role catalog reload rejected, keeping version {self._catalog.version}: {e}")
+                return False
+            self.last_error = None
+            if catalog.version == self._catalog.version:
+                return False
+            previous, self._catalog = self._catalog, catalog
+            self.reloads += 1
+
+        logger.info(f"Role catalog reloaded: {previous.version} -> {catalog.version} ({len(catalog.roles)} roles)")
+        for listener in self.listeners:
+            try:
+                listener(catalog)
+            except Exception as e:
+                logger.error(f"Role catalog listener failed: {e}")
+        return True
+
+    async def run(self):
+        while self.interval > 0:
+            await asyncio.sleep(self.interval)
+            try:
+                await asyncio.to_thread(self.reload)
+            except Exception as e:
+                logger.error(f"Role catalog reload failed: {e}")
+
+    def snapshot(self) -> dict:
+        catalog = self._catalog
+        return {
+            "version": catalog.version,
+            "path": self.path,
+            "roles": len(catalog.roles),
+            "loaded_at": catalog.loaded_at,
+            "reloads": self.reloads,
+            "last_error": self.last_error,
+        }
+
+
+class RolesView(Mapping):
+    """Read-only role id -> config mapping that always reads the store's current catalog."""
+
+    def __init__(self, store: RoleCatalogStore):
+        self.store = store
+
+    def __getitem__(self, role_id):
+        return self.store.current.roles[role_id]
+
+    def __iter__(self):
+        return iter(self.store.current.roles)
+
+    def __len__(self):
+        return len(self.store.current.roles)
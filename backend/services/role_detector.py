@@ -1,22 +1,22 @@
-from backend.roles import ROLES
+from backend.roles import ROLE_CATALOG
 
-def detect_role(resume_text: str):
-    resume_text = resume_text.lower()
-    role_scores = {}
+def scan_roles(resume_text: str):
+    """Single pass over the resume: returns (scan, per-role matched keyword counts)."""
+    # Built once per catalog version; a single scan serves every role.
+    index = ROLE_CATALOG.current.index
+    scan = index.scan(resume_text)
+    return scan, index.role_scores(scan)
 
-    for role_key, role in ROLES.items():
-        score = 0
-        formatted_keywords = role.get("keywords", [])
-        
-        # Determine if keywords is a list of strings or dicts (just in case structure changes)
-        # Assuming list of strings based on roles.py
-        for keyword in formatted_keywords:
-            if keyword.lower() in resume_text:
-                score += 1
-        role_scores[role_key] = score
+def detect_role(resume_text: str, tie_breaker: dict = None):
+    """
+    Role with the most matched keywords. `tie_breaker` (role -> score, e.g.
+    semantic similarity) decides between roles with equal keyword counts.
+    """
+    _, role_scores = scan_roles(resume_text)
 
     if not role_scores:
         return "software_engineer", 0
 
-    detected_role = max(role_scores, key=role_scores.get)
+    tie_breaker = tie_breaker or {}
+    detected_role = max(role_scores, key=lambda r: (role_scores[r], tie_breaker.get(r, 0)))
     return detected_role, role_scores[detected_role]
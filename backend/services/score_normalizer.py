@@ -9,6 +9,7 @@ def formatting_score(resume_text: str) -> int:
     return max(score, 40)
 
 def normalize_ats_score(llm_score: float, keyword_score: float, formatting_score: float) -> float:
+    # Fixed mix for callers without deterministic features; see scoring_engine for the role-weighted score
     final_score = (
         (llm_score * 0.6) +
         (keyword_score * 0.25) +
@@ -0,0 +1,183 @@
+import numpy as np
+from backend.config import SCORE_AI_SHARE, SCORE_LLM_SECTION_SHARE
+from backend.services.role_catalog import WEIGHT_KEYS
+from backend.services.keyword_scoring import FREQUENCY_CAP
+from backend.services.score_normalizer import formatting_score
+from backend.services.estimator import base_features, EXPERIENCE_TARGET_YEARS
+
+SECTIONS = WEIGHT_KEYS
+
+
+def weight_matrix(weights_list) -> np.ndarray:
+    """(n, sections) rows of weights normalized to sum 1; missing or all-zero weights become uniform."""
+    w = np.array(
+        [[max(float((weights or {}).get(s, 0) or 0), 0.0) for s in SECTIONS] for weights in weights_list],
+        dtype=np.float64
+    ).reshape(-1, len(SECTIONS))
+    totals = w.sum(axis=1, keepdims=True)
+    return np.where(totals > 0, w / np.where(totals > 0, totals, 1), 1.0 / len(SECTIONS))
+
+
+def section_matrix(features_list, llm_sections_list=None, llm_share: float = SCORE_LLM_SECTION_SHARE) -> np.ndarray:
+    """
+    (n, sections) section scores: the deterministic feature, blended with the
+    LLM's section score where the LLM gave one. Zeros are the prompt
+    template's placeholders echoed back and count as not given.
+    """
+    features = np.array([[float(f.get(s, 0) or 0) for s in SECTIONS] for f in features_list], dtype=np.float64)
+    features = features.reshape(-1, len(SECTIONS))
+    if not llm_sections_list:
+        return features
+    llm = np.full(features.shape, np.nan)
+    for i, sections in enumerate(llm_sections_list):
+        if isinstance(sections, dict):
+            values = [_number(sections.get(s)) for s in SECTIONS]
+            llm[i] = [v if v is not None and v > 0 else np.nan for v in values]
+    llm = np.clip(llm, 0, 100)
+    return np.where(np.isnan(llm), features, llm_share * llm + (1 - llm_share) * features)
+
+
+def _number(value):
+    if isinstance(value, bool):
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def hybrid_scores(ai_scores, sections: np.ndarray, weights: np.ndarray, ai_share: float = SCORE_AI_SHARE):
+    """
+    (final, role-weighted section score) arrays. `sections` and `weights` are
+    (..., sections) and broadcast against each other: one resume x every role
+    is (1, S) x (R, S), a batch against one role is (N, S) x (1, S).
+    """
+    weighted = np.einsum("...s,...s->...", *np.broadcast_arrays(sections, weights))
+    final = ai_share * np.asarray(ai_scores, dtype=np.float64) + (1 - ai_share) * weighted
+    return np.round(final, 2), np.round(weighted, 2)
+
+
+def hybrid_score(ai_score: float, features: dict, llm_sections: dict, weights: dict) -> tuple:
+    """Single resume, single role (which may come from a job description rather than the catalog)."""
+    sections = section_matrix([features], [llm_sections] if llm_sections else None)
+    final, weighted = hybrid_scores(ai_score, sections, weight_matrix([weights]))
+    return float(final[0]), float(weighted[0]), dict(zip(SECTIONS, np.round(sections[0], 2).tolist()))
+
+
+def profile_features(base: dict, profile: dict) -> dict:
+    """base_features with the LLM-extracted experience and education facts where the profile has them."""
+    features = dict(base)
+    years = profile.get("experienceYears")
+    if isinstance(years, (int, float)) and not isinstance(years, bool):
+        features["experience_years"] = float(years)
+        features["experience"] = round(min(years / EXPERIENCE_TARGET_YEARS, 1.0) * 100, 2)
+    if profile.get("education"):
+        features["education"] = 100.0
+    return features
+
+
+class ScoringEngine:
+    """
+    Role-weighted hybrid scoring over one catalog version, as matrix operations.
+
+    The catalog is turned into a (roles x sections) weight matrix and a
+    (roles x keywords) incidence matrix once. Scoring one resume against every
+    role is then one keyword scan plus a couple of matrix-vector products, and
+    a batch of resumes against one role is a single (N x sections) product.
+    Without an LLM call the AI share of the score is the calibrated estimate.
+    """
+
+    def __init__(self, catalog, estimator=None):
+        self.version = catalog.version
+        self.index = catalog.index
+        self.role_ids = list(catalog.compiled)
+        self.titles = [catalog.roles[r]["title"] for r in self.role_ids]
+        self.weights = np.array(
+            [[catalog.compiled[r].weights[s] for s in SECTIONS] for r in self.role_ids], dtype=np.float64
+        )
+        columns = {keyword: i for i, keyword in enumerate(self.index.keywords)}
+        self.incidence = np.zeros((len(self.role_ids), len(columns)), dtype=np.float64)
+        for i, role_id in enumerate(self.role_ids):
+            self.incidence[i, [columns[k] for k in catalog.compiled[role_id].keywords]] = 1.0
+        self.keyword_totals = self.incidence.sum(axis=1)
+        self.estimator = estimator
+
+    def keyword_scores(self, scan, extra_scan=None) -> tuple:
+        """
+        Per-role (density, frequency-weighted density), both 0-100, from one
+        catalog scan (plus `extra_scan`, e.g. of a profile's skill list).
+        """
+        counts = np.array([scan.counts.get(k, 0) for k in self.index.keywords], dtype=np.float64)
+        if extra_scan is not None:
+            counts += [extra_scan.counts.get(k, 0) for k in self.index.keywords]
+        density = self.incidence @ (counts > 0) / self.keyword_totals * 100
+        weighted = self.incidence @ (np.minimum(counts, FREQUENCY_CAP) / FREQUENCY_CAP) / self.keyword_totals * 100
+        return np.round(density, 2), np.round(weighted, 2)
+
+    def role_features(self, resume_text: str, f_score: float = None, profile: dict = None) -> tuple:
+        """
+        ((roles x sections) deterministic features, per-role keyword density)
+        for one resume. With an extracted `profile`, its skills count as
+        keyword hits and its experienceYears / education replace the regex
+        guesses.
+        """
+        skills_scan = self.index.scan(", ".join(
+            str(s.get("name", "")) if isinstance(s, dict) else str(s) for s in profile.get("skills", [])
+        )) if profile else None
+        density, weighted = self.keyword_scores(self.index.scan(resume_text), skills_scan)
+        base = base_features(resume_text, formatting_score(resume_text) if f_score is None else f_score)
+        if profile:
+            base = profile_features(base, profile)
+        features = np.empty((len(self.role_ids), len(SECTIONS)))
+        for j, section in enumerate(SECTIONS):
+            if section == "skills":
+                features[:, j] = density
+            elif section == "relevance":
+                features[:, j] = weighted
+            else:
+                features[:, j] = base[section]
+        return features, density
+
+    def estimate(self, sections: np.ndarray, weights: np.ndarray) -> np.ndarray:
+        """Calibrated AI-score stand-in for each row (the vector form of ScoreEstimator.estimate)."""
+        priors = np.einsum("...s,...s->...", *np.broadcast_arrays(sections, weights))
+        return self.estimator.calibrate(priors) if self.estimator is not None else np.round(priors, 2)
+
+    def rank_roles(self, resume_text: str, top_k: int = None, profile: dict = None, role_ids: list = None) -> list:
+        """
+        One resume against every catalog role (or just `role_ids`), best
+        first, with no LLM call. A profile's section_scores are blended into
+        the role-independent sections like an analysis' section_scores.
+        """
+        sections, density = self.role_features(resume_text, profile=profile)
+        if profile and profile.get("section_scores"):
+            llm = {k: v for k, v in profile["section_scores"].items() if k not in ("skills", "relevance")}
+            sections = section_matrix(
+                [dict(zip(SECTIONS, row)) for row in sections], [llm] * len(sections)
+            )
+        ai = self.estimate(sections, self.weights)
+        final, weighted = hybrid_scores(ai, sections, self.weights)
+        order = np.argsort(-final, kind="stable")
+        if role_ids is not None:
+            wanted = set(role_ids)
+            order = [i for i in order if self.role_ids[i] in wanted]
+        order = order[:top_k]
+        return [
+            {
+                "role_id": self.role_ids[i], "title": self.titles[i], "score": float(final[i]),
+                "ai_estimate": float(ai[i]), "section_score": float(weighted[i]),
+                "keyword_match_score": float(density[i]),
+            }
+            for i in order
+        ]
+
+    def score_batch(self, features_list: list, weights: dict, ai_scores=None, llm_sections_list=None) -> dict:
+        """
+        A batch of resumes (their extract_features dicts) against one role's
+        weights. ai_scores defaults to the calibrated estimate per resume.
+        """
+        sections = section_matrix(features_list, llm_sections_list)
+        w = weight_matrix([weights])
+        ai = self.estimate(sections, w) if ai_scores is None else np.asarray(ai_scores, dtype=np.float64)
+        final, weighted = hybrid_scores(ai, sections, w)
+        return {"score": final, "ai_score": ai, "section_score": weighted}
@@ -0,0 +1,186 @@
+import zlib
+import logging
+import numpy as np
+from backend.services.keyword_index import tokenize
+
+logger = logging.getLogger(__name__)
+
+# Common spellings folded onto one token before hashing, so e.g. "k8s" and
+# "kubernetes" land in the same dimension.
+SYNONYMS = {
+    "js": "javascript",
+    "ts": "typescript",
+    "node": "nodejs",
+    "k8s": "kubernetes",
+    "postgres": "postgresql",
+    "golang": "go",
+    "ml": "machine learning",
+    "dl": "deep learning",
+    "ai": "artificial intelligence",
+    "sklearn": "scikit learn",
+    "tf": "tensorflow",
+    "gcloud": "gcp",
+    "ux": "user experience",
+    "ui": "user interface",
+    "qa": "quality assurance",
+    "pm": "product manager",
+}
+
+
+def role_document(role: dict) -> str:
+    """Text used to represent a role: title, description and (twice-weighted) keywords."""
+    keywords = " ".join(role.get("keywords", []))
+    return " ".join([role.get("title", ""), role.get("description", ""), keywords, keywords])
+
+
+class HashingEmbedder:
+    """
+    Dependency-free fallback embedder: unigrams + bigrams hashed into `dim`
+    buckets, sublinear TF weighted by IDF fitted on the role corpus, L2 normalized.
+    """
+
+    name = "hashing-tfidf"
+
+    def __init__(self, dim: int = 4096):
+        self.dim = dim
+        self.idf = np.ones(dim, dtype=np.float32)
+
+    def _features(self, text: str) -> list:
+        words = []
+        for token, _, _ in tokenize(text):
+            words.extend(SYNONYMS.get(token, token).split())
+        grams = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+        return [zlib.crc32(g.encode("utf-8")) % self.dim for g in grams]
+
+    def _counts(self, text: str) -> np.ndarray:
+        vec = np.zeros(self.dim, dtype=np.float32)
+        np.add.at(vec, np.asarray(self._features(text), dtype=np.int64), 1.0)
+        return vec
+
+    def fit(self, documents: list):
+        df = np.zeros(self.dim, dtype=np.float32)
+        for doc in documents:
+            df[np.unique(np.asarray(self._features(doc), dtype=np.int64))] += 1
+        self.idf = (np.log((1 + len(documents)) / (1 + df)) + 1).astype(np.float32)
+        return self
+
+    def embed(self, texts: list) -> np.ndarray:
+        matrix = np.stack([self._counts(t) for t in texts]) if texts else np.zeros((0, self.dim), np.float32)
+        np.log1p(matrix, out=matrix)
+        matrix *= self.idf
+        return normalize_rows(matrix)
+
+
+class SentenceTransformerEmbedder:
+    """Local sentence-transformers model (optional dependency)."""
+
+    def __init__(self, model_name: str):
+        from sentence_transformers import SentenceTransformer
+        self.name = model_name
+        self.model = SentenceTransformer(model_name)
+
+    def fit(self, documents: list):
+        return self
+
+    def embed(self, texts: list) -> np.ndarray:
+        return normalize_rows(np.asarray(self.model.encode(texts), dtype=np.float32))
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def make_embedder(model_name: str = None, dim: int = 4096):
+    """Uses the named local embedding model if it can be loaded, else the hashing fallback."""
+    if model_name:
+        try:
+            return SentenceTransformerEmbedder(model_name)
+        except Exception as e:
+            logger.warning(f"Embedding model '{model_name}' unavailable ({e}); using hashing TF-IDF.")
+    return HashingEmbedder(dim)
+
+
+class SemanticRoleMatcher:
+    """
+    Scores a resume against every role with one matrix-vector product.
+
+    The role matrix (n_roles x dim, rows L2-normalized) is built once at
+    startup or loaded from a precomputed .npz file, so scoring cost is a
+    single BLAS call regardless of whether there are 16 roles or thousands.
+    `catalog_version` is the role catalog version the matrix was built from.
+    """
+
+    def __init__(self, embedder, role_ids: list, titles: list, matrix: np.ndarray, catalog_version: str = None):
+        self.embedder = embedder
+        self.role_ids = list(role_ids)
+        self.titles = list(titles)
+        self.matrix = matrix.astype(np.float32, copy=False)
+        self.catalog_version = catalog_version
+
+    @classmethod
+    def from_roles(cls, roles: dict, embedder, catalog_version: str = None):
+        role_ids = list(roles)
+        documents = [role_document(roles[r]) for r in role_ids]
+        embedder.fit(documents)
+        titles = [roles[r].get("title", r) for r in role_ids]
+        return cls(embedder, role_ids, titles, embedder.embed(documents), catalog_version)
+
+    def save(self, path: str):
+        extra = {"idf": self.embedder.idf} if isinstance(self.embedder, HashingEmbedder) else {}
+        if self.catalog_version:
+            extra["catalog_version"] = np.asarray(self.catalog_version)
+        np.savez_compressed(
+            path, matrix=self.matrix, role_ids=np.asarray(self.role_ids), titles=np.asarray(self.titles),
+            embedder=np.asarray(self.embedder.name), **extra
+        )
+
+    @classmethod
+    def load(cls, path: str, model_name: str = None):
+        data = np.load(path, allow_pickle=False)
+        matrix = data["matrix"]
+        if "idf" in data:
+            embedder = HashingEmbedder(matrix.shape[1])
+            embedder.idf = data["idf"].astype(np.float32)
+        else:
+            embedder = SentenceTransformerEmbedder(model_name or str(data["embedder"]))
+        version = str(data["catalog_version"]) if "catalog_version" in data else None
+        return cls(embedder, data["role_ids"].tolist(), data["titles"].tolist(), matrix, version)
+
+    def scores(self, resume_text: str) -> np.ndarray:
+        vector = self.embedder.embed([resume_text])[0]
+        return self.matrix @ vector
+
+    def top_k(self, resume_text: str, k: int = 5) -> list:
+        return self.rank(self.scores(resume_text), k)
+
+    def rank(self, scores: np.ndarray, k: int = 5) -> list:
+        """Top-k role matches from an already computed scores() vector."""
+        k = min(k, len(scores))
+        if k <= 0:
+            return []
+        # argpartition keeps this O(n) in the number of roles
+        idx = np.argpartition(-scores, k - 1)[:k]
+        idx = idx[np.argsort(-scores[idx])]
+        return [
+            {"role_id": self.role_ids[i], "title": self.titles[i], "score": round(float(scores[i]), 4)}
+            for i in idx
+        ]
+
+    def score_map(self, resume_text: str = None, scores: np.ndarray = None) -> dict:
+        scores = self.scores(resume_text) if scores is None else scores
+        return dict(zip(self.role_ids, scores.tolist()))
+
+
+if __name__ == "__main__":
+    # Precompute the role matrix: python -m backend.services.semantic_matcher roles.npz
+    import sys
+    from backend.roles import ROLE_CATALOG
+    from backend.config import SEMANTIC_MODEL, SEMANTIC_DIM
+    out = sys.argv[1] if len(sys.argv) > 1 else "role_vectors.npz"
+    catalog = ROLE_CATALOG.current
+    SemanticRoleMatcher.from_roles(
+        catalog.roles, make_embedder(SEMANTIC_MODEL, SEMANTIC_DIM), catalog.version
+    ).save(out)
+    print(f"Wrote {out}")
@@ -0,0 +1,47 @@
+from fastapi import HTTPException
+from starlette.responses import JSONResponse
+
+
+class UploadLimitMiddleware:
+    """
+    Rejects oversized request bodies before they are parsed.
+
+    `limits` maps a POST path to its maximum body size in bytes. Requests that
+    declare a larger Content-Length get a 413 immediately; bodies without one
+    (chunked) are counted as they stream in and cut off once over the limit.
+    """
+
+    def __init__(self, app, limits: dict):
+        self.app = app
+        self.limits = limits
+
+    async def __call__(self, scope, receive, send):
+        limit = None
+        if scope["type"] == "http" and scope["method"] == "POST":
+            limit = self.limits.get(scope["path"])
+        if limit is None:
+            return await self.app(scope, receive, send)
+
+        headers = dict(scope.get("headers") or [])
+        declared = headers.get(b"content-length")
+        if declared is not None and declared.isdigit() and int(declared) > limit:
+            response = JSONResponse({"detail": too_large_message(limit)}, status_code=413)
+            return await response(scope, receive, send)
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    # FastAPI re-raises HTTPExceptions from body parsing as-is
+                    raise HTTPException(status_code=413, detail=too_large_message(limit))
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
+def too_large_message(limit: int) -> str:
+    return f"Upload too large (max {limit // (1024 * 1024)} MB)"
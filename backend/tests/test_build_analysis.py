@@ -0,0 +1,52 @@
+import json
+
+from backend.models import AnalysisResponse
+from backend.services.analysis import build_analysis, deterministic_features, deterministic_scores
+from backend.services.llm_output import parse_analysis
+from backend.services.report_store import ReportStore
+
+ROLE = {
+    "title": "Data Engineer",
+    "keywords": ["python", "sql", "spark"],
+    "weights": {"skills": 40, "experience": 30, "education": 10, "formatting": 10, "relevance": 10},
+}
+RESUME = "Jane Doe\nSkills\nPython, SQL\nExperience\nData engineer 2018 - 2023"
+ECHOED = {
+    "atsScore": 80, "summary": "Good", "strengths": ["SQL"], "weaknesses": [], "improvementSuggestions": [],
+    "skills": ["Python"],
+    # Server-owned fields an LLM might echo back
+    "matched_keywords": ["python"], "missing_keywords": ["cobol"], "keyword_weighted_score": "high",
+    "report_url": "http://evil.example/report.pdf", "report_file": 7, "estimated": "yes",
+    "features": [1, 2], "final_ats_score": 100, "keyword_match_score": 100,
+}
+
+
+def analyze(raw_llm, tmp_path, with_features=True):
+    k_score, f_score, details = deterministic_scores(RESUME, ROLE)
+    features = deterministic_features(RESUME, details, f_score) if with_features else None
+    store = ReportStore(str(tmp_path))
+    return build_analysis(ROLE, raw_llm, k_score, f_score, store, details, features), details
+
+
+def test_echoed_server_fields_do_not_override_computed_ones(tmp_path):
+    final_data, details = analyze(dict(ECHOED), tmp_path)
+    response = AnalysisResponse(**final_data)
+    assert [m.keyword for m in response.matched_keywords] == ["python", "sql"]
+    assert response.missing_keywords == details["missing"] == ["spark"]
+    assert response.keyword_weighted_score == details["weighted_score"]
+    assert response.report_url.startswith("/reports/")
+    assert response.estimated is False and response.features is None
+    assert response.final_ats_score != 100
+
+
+def test_echoed_fields_without_keyword_details(tmp_path):
+    k_score, f_score, _ = deterministic_scores(RESUME, ROLE)
+    final_data = build_analysis(ROLE, dict(ECHOED), k_score, f_score, ReportStore(str(tmp_path)))
+    response = AnalysisResponse(**final_data)
+    assert response.matched_keywords == [] and response.missing_keywords == []
+
+
+def test_parse_analysis_drops_server_fields():
+    parsed = parse_analysis(json.dumps(ECHOED))
+    assert "matched_keywords" not in parsed.data and "estimated" not in parsed.data
+    assert parsed.complete
@@ -0,0 +1,19 @@
+from backend.services.jd_analyzer import extract_jd_role
+from backend.services.keyword_index import RoleKeywordIndex
+
+JD = """Senior Data Engineer
+We are hiring a data engineer to design and maintain reliable pipelines for our products.
+You will collaborate with analysts and scientists and deliver clean datasets.
+Requirements: 5+ years of Python and SQL, Airflow orchestration, Spark.
+Experience with Airflow DAGs and dbt models; dbt tests are a plus.
+"""
+
+
+def test_only_catalog_hits_and_repeated_terms_become_keywords():
+    index = RoleKeywordIndex({"data": {"keywords": ["python", "sql", "spark"]}})
+    keywords = extract_jd_role(JD, index)["keywords"]
+    assert keywords[:3] == ["python", "spark", "sql"]
+    assert set(keywords[3:]) == {"data engineer", "airflow", "dbt"}
+    for noise in ("hiring", "design", "maintain", "collaborate", "analysts", "scientists",
+                  "deliver", "reliable", "products", "pipelines", "orchestration"):
+        assert noise not in keywords
@@ -0,0 +1,50 @@
+import json
+
+import pytest
+
+from backend.services.json_stream import IncrementalJSONObjectParser
+
+ANSWER = json.dumps({
+    "atsScore": 82,
+    "summary": "Strong {backend} profile, \"Python\" heavy, ends with a \\",
+    "strengths": ["APIs, services", "SQL"],
+    "section_scores": {"skills": 90, "experience": [1, {"a": "}"}]},
+    "skills": [],
+})
+
+
+def feed_chunks(chunks) -> list:
+    parser = IncrementalJSONObjectParser()
+    fields = []
+    for chunk in chunks:
+        fields.extend(parser.feed(chunk))
+    assert parser.done
+    return fields
+
+
+def test_whole_answer_in_one_chunk():
+    assert feed_chunks([ANSWER]) == list(json.loads(ANSWER).items())
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 16])
+def test_every_chunk_boundary_gives_the_same_fields(size):
+    chunks = [ANSWER[i:i + size] for i in range(0, len(ANSWER), size)]
+    assert feed_chunks(chunks) == list(json.loads(ANSWER).items())
+
+
+def test_split_inside_escape_and_key():
+    fields = feed_chunks(['{"sum', 'mary": "a\\', '"b", "atsScore"', ": 7", "0}"])
+    assert fields == [("summary", 'a"b'), ("atsScore", 70)]
+
+
+def test_fields_are_emitted_as_soon_as_they_complete():
+    parser = IncrementalJSONObjectParser()
+    assert parser.feed('{"summary": "ok", "strengths": ["a"') == [("summary", "ok")]
+    assert parser.feed('], "atsScore": 5') == [("strengths", ["a"])]
+    assert parser.feed("}") == [("atsScore", 5)]
+
+
+def test_text_after_the_object_is_ignored():
+    parser = IncrementalJSONObjectParser()
+    assert parser.feed('{"atsScore": 1}\n{"atsScore": 2}') == [("atsScore", 1)]
+    assert parser.feed(', "x": 3}') == []
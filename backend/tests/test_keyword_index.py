@@ -0,0 +1,73 @@
+import pytest
+
+from backend.services.keyword_index import KeywordIndex, RoleKeywordIndex
+from backend.services.keyword_scoring import keyword_density_score, keyword_match
+
+
+@pytest.mark.parametrize("text, keyword", [
+    ("Worked with NoSQL stores", "sql"),
+    ("Build pipelines", "ui"),
+    ("javascript developer", "java"),
+    ("Scalable systems", "scala"),
+    ("Gopher enthusiast", "go"),
+])
+def test_keywords_do_not_match_inside_other_words(text, keyword):
+    assert KeywordIndex([keyword]).scan(text).counts == {}
+
+
+@pytest.mark.parametrize("text, keyword", [
+    ("SQL, Python; Go.", "sql"),
+    ("(go)", "go"),
+    ("skills:java/scala", "java"),
+    ("C++ and C# daily", "c++"),
+    ("C++ and C# daily", "c#"),
+])
+def test_keywords_match_between_punctuation(text, keyword):
+    assert KeywordIndex([keyword]).scan(text).counts == {keyword: 1}
+
+
+def test_c_does_not_match_cpp():
+    assert KeywordIndex(["c"]).scan("C++ and C#").counts == {}
+
+
+def test_phrases_match_across_separators_with_offsets():
+    text = "Set up CI/CD and REST API design; rest  api docs"
+    scan = KeywordIndex(["ci/cd", "rest api"]).scan(text)
+    assert scan.counts == {"ci/cd": 1, "rest api": 2}
+    assert [text[s:e] for s, e in scan.spans["ci/cd"]] == ["CI/CD"]
+    assert [text[s:e] for s, e in scan.spans["rest api"]] == ["REST API", "rest  api"]
+
+
+def test_phrase_needs_every_token_in_order():
+    assert KeywordIndex(["machine learning"]).scan("learning machine, machine vision").counts == {}
+
+
+def test_overlapping_keywords_are_counted_independently():
+    scan = KeywordIndex(["learning", "machine learning"]).scan("Machine learning and deep learning")
+    assert scan.counts == {"machine learning": 1, "learning": 2}
+
+
+def test_duplicate_keywords_collapse_case_insensitively():
+    index = KeywordIndex(["Python", "python", "SQL"])
+    assert index.keywords == ["python", "sql"]
+
+
+def test_density_and_match_agree():
+    keywords = ["Python", "SQL", "Docker", "Kubernetes"]
+    text = "Python and sql, python again; no k8s"
+    result = keyword_match(text, keywords)
+    assert result["score"] == keyword_density_score(text, keywords) == 50.0
+    assert [m["keyword"] for m in result["matched"]] == ["Python", "SQL"]
+    assert result["missing"] == ["Docker", "Kubernetes"]
+    assert result["matched"][0]["count"] == 2
+
+
+def test_role_index_counts_distinct_keywords_per_role():
+    roles = {
+        "data": {"keywords": ["python", "sql", "pandas"]},
+        "web": {"keywords": ["javascript", "css", "sql"]},
+    }
+    index = RoleKeywordIndex(roles)
+    scan = index.scan("SQL, SQL and pandas; JavaScript")
+    assert index.role_scores(scan) == {"data": 2, "web": 2}
+    assert index.role_density(scan, "data") == round(2 / 3 * 100, 2)
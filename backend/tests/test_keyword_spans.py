@@ -0,0 +1,26 @@
+from backend.services.keyword_index import tokenize
+from backend.services.keyword_scoring import keyword_match
+
+
+def test_spans_index_the_original_text_after_length_changing_lowercase():
+    text = "İstanbul İzmir team. Skills: python, sql"
+    assert len(text.lower()) != len(text)
+    result = keyword_match(text, ["python", "sql"])
+    for match in result["matched"]:
+        for start, end in match["spans"]:
+            assert text[start:end].lower() == match["keyword"]
+
+
+def test_spans_keep_original_case():
+    text = "Built REST APIs in Python and PostgreSQL"
+    result = keyword_match(text, ["python", "rest api", "postgresql"])
+    spans = {m["keyword"]: m["spans"] for m in result["matched"]}
+    assert [text[s:e] for s, e in spans["python"]] == ["Python"]
+    assert [text[s:e] for s, e in spans["postgresql"]] == ["PostgreSQL"]
+    assert result["missing"] == ["rest api"]  # "apis" is a different token
+
+
+def test_tokens_are_lowercased_and_offsets_point_into_input():
+    text = "İstanbul, C++ and C#"
+    assert [t for t, _, _ in tokenize(text)] == ["istanbul", "c++", "and", "c#"]
+    assert [text[s:e] for _, s, e in tokenize(text)] == ["İstanbul", "C++", "and", "C#"]
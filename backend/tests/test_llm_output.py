@@ -0,0 +1,90 @@
+from backend.services.llm_output import (
+    REQUIRED_FIELDS, extract_object, loads_lenient, parse_analysis, parse_profile, repair_prompt
+)
+
+COMPLETE = (
+    '{"atsScore": 78, "summary": "Solid", "strengths": ["SQL"], "weaknesses": ["Cloud"], '
+    '"improvementSuggestions": ["Add metrics"], "skills": ["Python"]}'
+)
+
+
+def test_clean_answer_is_complete_and_not_repaired():
+    parsed = parse_analysis(COMPLETE)
+    assert parsed.complete and not parsed.repaired
+    assert parsed.data["atsScore"] == 78.0
+
+
+def test_code_fence_and_prose_are_stripped():
+    data, repaired = loads_lenient(f"Here is the analysis:\n```json\n{COMPLETE}\n```\nHope this helps!")
+    assert data["summary"] == "Solid"
+    assert repaired
+
+
+def test_truncated_answer_is_closed():
+    cut = '{"atsScore": 64, "summary": "Good fit", "strengths": ["Python", "Do'
+    _, truncated = extract_object(cut)
+    assert truncated
+    data, repaired = loads_lenient(cut)
+    assert repaired
+    assert data["atsScore"] == 64
+    assert data["strengths"] == ["Python"]  # the cut-off element is dropped, not guessed
+
+
+def test_truncated_after_a_key_drops_the_dangling_key():
+    data, _ = loads_lenient('{"atsScore": 50, "summary": "x", "weaknesses":')
+    assert data == {"atsScore": 50, "summary": "x"}
+
+
+def test_python_dict_literal():
+    data, repaired = loads_lenient("{'atsScore': 61, 'summary': 'Fine', 'remote': False, 'notes': None}")
+    assert repaired
+    assert data == {"atsScore": 61, "summary": "Fine", "remote": False, "notes": None}
+
+
+def test_python_literals_unquoted_keys_and_trailing_commas():
+    answer = "{atsScore: 70, 'summary': 'Fine', verified: True, notes: None, skills: ['Go',],}"
+    data, repaired = loads_lenient(answer)
+    assert repaired
+    assert data == {"atsScore": 70, "summary": "Fine", "verified": True, "notes": None, "skills": ["Go"]}
+
+
+def test_smart_quotes_are_normalized():
+    data, _ = loads_lenient("{“atsScore”: 55, “summary”: “Ok”}")
+    assert data == {"atsScore": 55, "summary": "Ok"}
+
+
+def test_values_are_coerced_to_the_schema():
+    parsed = parse_analysis(
+        '{"atsScore": "Score: 85/100", "summary": ["Two", "parts"], "strengths": "APIs; SQL", '
+        '"weaknesses": [], "improvementSuggestions": [], "skills": []}'
+    )
+    assert parsed.complete and parsed.repaired
+    assert parsed.data["atsScore"] == 85.0
+    assert parsed.data["summary"] == "Two parts"
+    assert parsed.data["strengths"] == ["APIs", "SQL"]
+
+
+def test_missing_fields_are_reported_for_the_repair_prompt():
+    parsed = parse_analysis('{"summary": "Only a summary"}')
+    assert parsed.missing == [f for f in REQUIRED_FIELDS if f != "summary"]
+    prompt = repair_prompt(parsed.missing)
+    assert all(f'"{field}"' in prompt for field in parsed.missing)
+
+
+def test_repair_answer_is_parsed_for_requested_fields_only():
+    extra = parse_analysis('{"atsScore": 71, "summary": "ignored"}', fields=["atsScore"])
+    assert extra.data == {"atsScore": 71.0}
+    assert extra.missing == []
+
+
+def test_prose_without_json_becomes_the_summary():
+    parsed = parse_analysis("The candidate looks strong in data engineering.")
+    assert not parsed.found_json
+    assert parsed.data["summary"].startswith("The candidate")
+    assert "atsScore" in parsed.missing
+
+
+def test_profile_schema():
+    parsed = parse_profile('{"summary": "x", "skills": ["SQL"], "experienceYears": "6 years", "education": "BSc"}')
+    assert parsed.complete
+    assert parsed.data["experienceYears"] == 6.0
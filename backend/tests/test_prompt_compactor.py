@@ -0,0 +1,62 @@
+from backend.services.prompt_compactor import clean_lines, compact_resume, estimate_tokens, split_sections
+
+
+def test_small_resume_is_kept_whole():
+    text = "John Doe\njohn@example.com\nSkills\npython, sql\nExperience\nEngineer, Acme 2019 - 2021"
+    compacted, stats = compact_resume(text, token_budget=1500)
+    assert compacted.splitlines() == clean_lines(text)
+    assert stats["dropped_sections"] == []
+
+
+def test_single_long_line_is_truncated_not_dropped():
+    text = "python developer " * 476  # ~8,100 characters on one line (typical Tika output)
+    compacted, stats = compact_resume(text, token_budget=100)
+    assert compacted
+    assert text.startswith(compacted)
+    assert estimate_tokens(compacted) <= 100
+    assert stats["dropped_sections"] == []
+
+
+def test_long_header_line_keeps_name_and_partial_text():
+    text = "John Doe\n" + "x" * 8000 + "\nSkills\npython"
+    compacted, _ = compact_resume(text, token_budget=200)
+    lines = compacted.splitlines()
+    assert lines[0] == "John Doe"
+    assert lines[1].startswith("xxxx")
+    assert estimate_tokens(compacted) <= 200
+
+
+def test_lower_priority_sections_still_fill_remaining_budget():
+    experience = "\n".join(f"Engineer at Company {i}, built systems and services" for i in range(40))
+    text = f"Jane Doe\nSkills\npython, sql\nExperience\n{experience}\nEducation\nBSc Computer Science"
+    compacted, stats = compact_resume(text, {"skills": 50, "experience": 40, "education": 10}, token_budget=120)
+    assert "python, sql" in compacted
+    assert "Engineer at Company 0, built systems and services" in compacted
+    assert "experience" not in stats["dropped_sections"]
+    assert estimate_tokens(compacted) <= 120
+
+
+def test_single_line_partial_section_is_kept():
+    skills = "python, sql, docker, kubernetes, " * 20
+    text = f"Jane Doe\nSkills\n{skills}"
+    compacted, stats = compact_resume(text, token_budget=30)
+    assert "Skills" in compacted
+    assert "skills" not in stats["dropped_sections"]
+
+
+def test_year_lines_are_not_noise():
+    lines = clean_lines("Experience\nAcme Corp\n2019\n-\n2021\nPage 2 of 3\n7\n12")
+    assert "2019" in lines
+    assert "2021" in lines
+    assert "Page 2 of 3" not in lines
+    assert "7" not in lines and "12" not in lines
+
+
+def test_boilerplate_and_repeated_headers_are_removed():
+    text = "Curriculum Vitae\nJohn Doe\nSkills\npython\nJohn Doe\nResume"
+    assert clean_lines(text) == ["John Doe", "Skills", "python"]
+
+
+def test_split_sections_keeps_document_order():
+    sections = split_sections(["John Doe", "Skills", "python", "Education", "BSc"])
+    assert [name for name, _ in sections] == ["header", "skills", "education"]
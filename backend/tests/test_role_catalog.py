@@ -0,0 +1,44 @@
+import copy
+import pickle
+
+import pytest
+
+from backend.services.llm_router import LLMBackend, LLMRouter
+from backend.services.role_catalog import RoleCatalog, RoleCatalogError, validate_roles
+
+ROLE = {
+    "title": "Data Engineer",
+    "keywords": ["python", "sql"],
+    "weights": {"skills": 50, "experience": 50},
+}
+
+
+def test_role_model_is_accepted_and_used_by_the_router():
+    catalog = RoleCatalog({"data_engineer": {**ROLE, "model": "llama3:70b"}})
+    router = LLMRouter([LLMBackend("http://llm")], "llama3")
+    assert router.model_for(catalog.get("data_engineer")) == "llama3:70b"
+
+
+@pytest.mark.parametrize("model", ["", "  ", 7, None])
+def test_invalid_role_model_is_rejected(model):
+    errors = validate_roles({"data_engineer": {**ROLE, "model": model}})
+    assert errors == ["roles.data_engineer.model: must be a non-empty model name (LLM used for this role)"]
+
+
+def test_unknown_fields_are_still_rejected():
+    with pytest.raises(RoleCatalogError, match="unknown fields"):
+        RoleCatalog({"data_engineer": {**ROLE, "modle": "llama3"}})
+
+
+def test_role_configs_can_be_copied_and_pickled():
+    role = RoleCatalog({"data_engineer": ROLE}).get("data_engineer")
+    tweaked = copy.deepcopy(role)
+    tweaked["weights"]["skills"] = 80
+    tweaked["keywords"].append("spark")
+    assert role["weights"]["skills"] == 50 and role["keywords"] == ("python", "sql")
+
+    assert copy.copy(role) is role
+    restored = pickle.loads(pickle.dumps(role))
+    assert restored == role and type(restored) is type(role)
+    with pytest.raises(TypeError):
+        restored["title"] = "x"
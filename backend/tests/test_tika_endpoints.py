@@ -0,0 +1,37 @@
+import pytest
+
+from backend.services.parser import TikaParser
+
+URLS = ["http://tika-a/tika", "http://tika-b/tika"]
+
+
+class FakeResponse:
+    text = "Jane Doe, Python"
+
+    def raise_for_status(self):
+        pass
+
+
+@pytest.fixture
+def parser():
+    parser = TikaParser(URLS, breaker_threshold=1, breaker_reset=0)
+    calls = []
+    parser.session.put = lambda url, **kwargs: calls.append(url) or FakeResponse()
+    parser.calls = calls
+    for _, breaker in parser.endpoints:
+        breaker.record_failure()  # open; reset_timeout=0 makes it half-open at once
+    return parser
+
+
+def test_half_open_endpoints_all_return_to_rotation(parser):
+    assert [b.state for _, b in parser.endpoints] == ["half-open", "half-open"]
+    for _ in range(4):
+        assert parser._extract(b"%PDF", "resume.pdf") == {"text": "Jane Doe, Python", "parser": "tika"}
+    assert parser.calls == URLS * 2
+    assert [b.state for _, b in parser.endpoints] == ["closed", "closed"]
+
+
+def test_untried_endpoint_keeps_its_trial_slot(parser):
+    parser._extract(b"%PDF", "resume.pdf")
+    # Only the first endpoint was used; the second can still run its trial call
+    assert parser.endpoints[1][1].allow()
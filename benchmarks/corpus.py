@@ -0,0 +1,124 @@
+import io
+import random
+import zipfile
+import hashlib
+from xml.sax.saxutils import escape
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfgen import canvas
+from backend.roles import ROLES
+
+# Approximate number of experience entries per size class (~1, ~3 and ~10 pages)
+SIZES = {"small": 3, "medium": 12, "large": 45}
+FORMATS = ("txt", "pdf", "docx")
+
+FIRST_NAMES = ["Asha", "Ben", "Chen", "Dana", "Eli", "Farah", "Goran", "Hana", "Ivan", "Jia", "Kofi", "Lena"]
+LAST_NAMES = ["Rao", "Smith", "Li", "Okafor", "Novak", "Haddad", "Garcia", "Kim", "Meyer", "Singh"]
+COMPANIES = ["Acme", "Globex", "Initech", "Umbrella", "Hooli", "Stark", "Wayne", "Wonka", "Tyrell", "Cyberdyne"]
+VERBS = ["Built", "Designed", "Led", "Migrated", "Optimized", "Maintained", "Automated", "Shipped"]
+FILLER = ["internal tooling", "customer dashboards", "data pipelines", "a payments service",
+          "the onboarding flow", "reporting jobs", "a search feature", "release processes"]
+
+
+def resume_text(rng: random.Random, role: dict, entries: int) -> str:
+    """A plausible resume for the role: header, summary, skills, dated experience entries, education."""
+    keywords = role["keywords"]
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    skills = rng.sample(keywords, k=max(1, int(len(keywords) * rng.uniform(0.4, 1.0))))
+    lines = [
+        name,
+        f"{name.split()[0].lower()}@example.com | +1 555 {rng.randint(1000, 9999)}",
+        "SUMMARY",
+        f"{role['title']} with {rng.randint(1, 12)}+ years of experience.",
+        "SKILLS",
+        ", ".join(skills),
+        "EXPERIENCE",
+    ]
+    year = 2025
+    for _ in range(entries):
+        start = year - rng.randint(1, 3)
+        lines.append(f"{role['title']}, {rng.choice(COMPANIES)} {start} - {year}")
+        for _ in range(rng.randint(2, 5)):
+            lines.append(f"{rng.choice(VERBS)} {rng.choice(FILLER)} using {rng.choice(keywords)} and {rng.choice(keywords)}.")
+        year = start
+    lines += ["EDUCATION", "B.Tech Computer Science, State University"]
+    return "\n".join(lines)
+
+
+def to_pdf(text: str) -> bytes:
+    buffer = io.BytesIO()
+    c = canvas.Canvas(buffer, pagesize=A4)
+    y = A4[1] - 50
+    for line in text.splitlines():
+        if y < 50:
+            c.showPage()
+            y = A4[1] - 50
+        c.drawString(50, y, line[:110])
+        y -= 14
+    c.save()
+    return buffer.getvalue()
+
+
+def to_docx(text: str) -> bytes:
+    """Minimal WordprocessingML package (enough for docx2txt / Tika)."""
+    paragraphs = "".join(f"<w:p><w:r><w:t>{escape(line)}</w:t></w:r></w:p>" for line in text.splitlines())
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("[Content_Types].xml", (
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/word/document.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+            '</Types>'
+        ))
+        zf.writestr("_rels/.rels", (
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            '<Relationship Id="rId1" '
+            'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+            'Target="word/document.xml"/></Relationships>'
+        ))
+        zf.writestr("word/document.xml", (
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+            f'<w:body>{paragraphs}</w:body></w:document>'
+        ))
+    return buffer.getvalue()
+
+
+class Corpus:
+    """
+    Deterministic synthetic corpus: `per_cell` resumes for every size x format.
+
+    `documents` holds (filename, bytes, text); `texts_by_digest` maps the
+    sha256 of each file to its text, which the fake Tika server returns.
+    """
+
+    def __init__(self, per_cell: int = 4, seed: int = 7):
+        rng = random.Random(seed)
+        roles = list(ROLES.values())
+        self.documents = []
+        for size, entries in SIZES.items():
+            for fmt in FORMATS:
+                for i in range(per_cell):
+                    text = resume_text(rng, rng.choice(roles), entries)
+                    if fmt == "pdf":
+                        content = to_pdf(text)
+                    elif fmt == "docx":
+                        content = to_docx(text)
+                    else:
+                        content = text.encode("utf-8")
+                    self.documents.append((f"{size}_{i}.{fmt}", content, text))
+        self.texts_by_digest = {hashlib.sha256(c).hexdigest(): t for _, c, t in self.documents}
+
+    def texts(self) -> list:
+        return [t for _, _, t in self.documents]
+
+    def summary(self) -> dict:
+        return {
+            "documents": len(self.documents),
+            "bytes": sum(len(c) for _, c, _ in self.documents),
+            "sizes": list(SIZES),
+            "formats": list(FORMATS),
+        }
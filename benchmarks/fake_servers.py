@@ -0,0 +1,165 @@
+import json
+import time
+import random
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeServer:
+    """
+    Local stand-in for an upstream service on 127.0.0.1 (random free port).
+
+    Every request waits `latency` seconds (+/- `jitter` fraction) and fails
+    with HTTP 500 with probability `failure_rate`.
+    """
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.2, failure_rate: float = 0.0, seed: int = 1):
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.requests = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def delay(self) -> bool:
+        """Sleeps for the simulated latency; returns False if this request should fail."""
+        with self._lock:
+            self.requests += 1
+            spread = self._rng.uniform(-self.jitter, self.jitter)
+            fail = self._rng.random() < self.failure_rate
+        if self.latency:
+            time.sleep(max(self.latency * (1 + spread), 0))
+        return not fail
+
+    def handle(self, handler: BaseHTTPRequestHandler, method: str):
+        raise NotImplementedError
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                server.handle(self, "GET")
+
+            def do_PUT(self):
+                server.handle(self, "PUT")
+
+            def do_POST(self):
+                server.handle(self, "POST")
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+def send(handler: BaseHTTPRequestHandler, status: int, body: bytes, content_type: str = "text/plain"):
+    handler.send_response(status)
+    handler.send_header("Content-Type", content_type)
+    handler.send_header("Content-Length", str(len(body)))
+    handler.end_headers()
+    handler.wfile.write(body)
+
+
+def read_body(handler: BaseHTTPRequestHandler) -> bytes:
+    return handler.rfile.read(int(handler.headers.get("Content-Length") or 0))
+
+
+class FakeTika(FakeServer):
+    """PUT /tika returns the corpus text for the uploaded file (looked up by sha256); GET /version."""
+
+    def __init__(self, texts_by_digest: dict, **kwargs):
+        super().__init__(**kwargs)
+        self.texts_by_digest = texts_by_digest
+
+    def handle(self, handler, method):
+        if method == "GET" and handler.path == "/version":
+            return send(handler, 200, b"Apache Tika 2.9.0 (fake)")
+        if method != "PUT" or not handler.path.startswith("/tika"):
+            return send(handler, 404, b"not found")
+        body = read_body(handler)
+        if not self.delay():
+            return send(handler, 500, b"simulated failure")
+        text = self.texts_by_digest.get(hashlib.sha256(body).hexdigest())
+        if text is None:
+            text = body.decode("utf-8", errors="ignore")
+        send(handler, 200, text.encode("utf-8"))
+
+
+class FakeOllama(FakeServer):
+    """
+    POST /api/chat with a canned analysis, profile or role narrative depending
+    on the prompt (streamed as NDJSON when requested); GET / for health.
+    """
+
+    def handle(self, handler, method):
+        if method == "GET":
+            return send(handler, 200, b"Ollama is running")
+        if method != "POST" or handler.path != "/api/chat":
+            return send(handler, 404, b"not found")
+        payload = json.loads(read_body(handler) or b"{}")
+        if not self.delay():
+            return send(handler, 500, b'{"error": "simulated failure"}', "application/json")
+        content = json.dumps(self.analysis(payload))
+        if not payload.get("stream"):
+            message = {"model": payload.get("model"), "message": {"role": "assistant", "content": content}, "done": True}
+            return send(handler, 200, json.dumps(message).encode("utf-8"), "application/json")
+
+        chunks = [content[i:i + 40] for i in range(0, len(content), 40)]
+        lines = [json.dumps({"message": {"content": c}, "done": False}) for c in chunks]
+        lines.append(json.dumps({"message": {"content": ""}, "done": True}))
+        send(handler, 200, ("\n".join(lines) + "\n").encode("utf-8"), "application/x-ndjson")
+
+    def analysis(self, payload: dict) -> dict:
+        prompt = payload.get("messages", [{}])[-1].get("content", "")
+        score = 40 + int(hashlib.sha256(prompt.encode("utf-8")).hexdigest(), 16) % 55
+        if "Extract the facts" in prompt:
+            return {
+                "candidateName": "Candidate",
+                "summary": "Synthetic profile from the benchmark stand-in.",
+                "skills": ["Python", "SQL", "Docker"],
+                "experienceYears": score % 12,
+                "experienceHighlights": ["Shipped things"],
+                "education": ["BSc Computer Science"],
+                "certifications": [],
+                "section_scores": {"experience": score, "education": 70, "formatting": 80},
+            }
+        if "Candidate profile" in prompt:
+            return {
+                "summary": "Synthetic role fit.",
+                "strengths": ["Relevant experience"],
+                "weaknesses": ["Few metrics"],
+                "improvementSuggestions": ["Quantify impact"],
+            }
+        return {
+            "atsScore": score,
+            "strengths": ["Relevant experience"],
+            "weaknesses": ["Few metrics"],
+            "improvementSuggestions": ["Quantify impact"],
+            "summary": "Synthetic analysis from the benchmark stand-in.",
+            "candidateName": "Candidate",
+            "skills": ["Python"],
+            "experienceHighlights": [],
+            "education": [],
+            "section_scores": {"skills": score, "experience": score, "education": 70, "formatting": 80, "relevance": score},
+        }
@@ -0,0 +1,68 @@
+import os
+import time
+import tempfile
+import statistics
+from backend.roles import ROLES
+from backend.services.role_detector import detect_role
+from backend.services.keyword_scoring import keyword_density_score, keyword_match
+from backend.services.report_generator import generate_ats_report
+from backend.services.extraction import extract_local
+from backend.services.analysis import deterministic_scores
+from backend.services.estimator import extract_features
+from backend.services.prompt_compactor import compact_resume
+from backend.services.scoring_engine import ScoringEngine
+from backend.roles import ROLE_CATALOG
+
+REPORT_DATA = {
+    "Generated On": "2025-01-01",
+    "Candidate Name": "Candidate",
+    "Target Role": "Software Engineer",
+    "Final Score": 78.5,
+    "Keyword Match": 70.0,
+    "AI Score": 82,
+    "Strengths": ["Relevant experience", "Strong Python background"],
+    "Improvements": ["Quantify impact", "Add certifications"],
+}
+
+
+def measure(fn, inputs: list, repeat: int = 5) -> dict:
+    """Runs fn over all inputs `repeat` times; per-call milliseconds (median and best round)."""
+    rounds = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for item in inputs:
+            fn(item)
+        rounds.append((time.perf_counter() - started) * 1000 / len(inputs))
+    return {"median_ms": round(statistics.median(rounds), 4), "best_ms": round(min(rounds), 4), "calls": len(inputs)}
+
+
+def micro_benchmarks(corpus, repeat: int = 5) -> dict:
+    texts = corpus.texts()
+    keywords = ROLES["software_engineer"]["keywords"]
+    with tempfile.TemporaryDirectory() as tmp:
+        report_path = os.path.join(tmp, "report.pdf")
+        return {
+            "detect_role": measure(detect_role, texts, repeat),
+            "keyword_density_score": measure(lambda t: keyword_density_score(t, keywords), texts, repeat),
+            "generate_ats_report": measure(lambda _: generate_ats_report(report_path, REPORT_DATA), range(20), repeat),
+        }
+
+
+def stage_timings(corpus, repeat: int = 3) -> dict:
+    """In-process cost of each pipeline stage that does not need an upstream service."""
+    role = ROLES["software_engineer"]
+    texts = corpus.texts()
+    extractable = [(name, content) for name, content, _ in corpus.documents if not name.endswith(".docx")]
+
+    def features(text):
+        k_score, f_score, match = deterministic_scores(text, role)
+        return extract_features(text, match, f_score)
+
+    return {
+        "parse_local_pdf_txt": measure(lambda doc: extract_local(doc[1], doc[0]), extractable, repeat),
+        "keyword_match": measure(lambda t: keyword_match(t, role["keywords"]), texts, repeat),
+        "deterministic_scores": measure(lambda t: deterministic_scores(t, role), texts, repeat),
+        "estimate_features": measure(features, texts, repeat),
+        "compact_prompt": measure(lambda t: compact_resume(t, role["weights"]), texts, repeat),
+        "rank_all_roles": measure(ScoringEngine(ROLE_CATALOG.current).rank_roles, texts, repeat),
+    }
@@ -0,0 +1,336 @@
+"""
+End-to-end benchmark: starts fake Tika/Ollama servers and the API (uvicorn
+subprocess), drives load scenarios against it and reports latency
+percentiles, throughput, peak RSS, server-side stage timings (from the
+Server-Timing header), in-process stage timings and
+micro-benchmarks. Compares against a baseline file and exits non-zero on
+regressions.
+
+    python -m benchmarks.run                     # run + compare with benchmarks/baseline.json
+    python -m benchmarks.run --save-baseline     # run + overwrite the baseline
+    python -m benchmarks.run --scenarios analyze --llm-latency 1.5 --concurrency 32
+"""
+import os
+import sys
+import json
+import time
+import socket
+import asyncio
+import argparse
+import platform
+import tempfile
+import threading
+import subprocess
+import httpx
+from benchmarks.corpus import Corpus
+from benchmarks.fake_servers import FakeTika, FakeOllama
+from benchmarks.micro import micro_benchmarks, stage_timings
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BASELINE = os.path.join(REPO_ROOT, "benchmarks", "baseline.json")
+DEFAULT_OUTPUT = os.path.join(REPO_ROOT, "benchmarks", "results", "latest.json")
+SCENARIOS = ("roles", "upload", "analyze", "analyze_fast", "analyze_multi")
+
+# Run parameters that must match for a baseline comparison to be meaningful
+COMPARABLE_ARGS = ("requests", "concurrency", "tika_latency", "llm_latency", "failure_rate", "per_cell", "cache")
+# Machine facts that must match too: timings from another host say nothing about this one
+COMPARABLE_MACHINE = ("platform", "cpus")
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def read_proc_status(pid: int, field: str):
+    """VmRSS / VmHWM in MB from /proc (Linux); None elsewhere."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        return None
+    return None
+
+
+class RSSSampler:
+    """Samples the server's RSS every 50 ms; peak() covers the current scenario."""
+
+    def __init__(self, pid: int):
+        self.pid = pid
+        self._peak = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(0.05):
+            rss = read_proc_status(self.pid, "VmRSS")
+            if rss is not None and (self._peak is None or rss > self._peak):
+                self._peak = rss
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+    def peak(self):
+        return self._peak
+
+
+def start_api(workdir: str, tika_url: str, ollama_url: str, cache: bool, log_path: str) -> tuple:
+    port = free_port()
+    env = dict(
+        os.environ,
+        PYTHONPATH=REPO_ROOT + os.pathsep + os.environ.get("PYTHONPATH", ""),
+        TIKA_URLS=f"{tika_url}/tika",
+        LLM_BACKENDS=ollama_url,
+        OLLAMA_MAX_CONCURRENCY=os.environ.get("OLLAMA_MAX_CONCURRENCY", "4"),
+        ANALYSIS_CACHE_ENABLED="true" if cache else "false",
+        PARSE_CACHE_ENABLED="true" if cache else "false",
+        SERVER_TIMING_ENABLED="true",
+    )
+    # Per-request server logging would dominate the console (and skew timings); keep it in a file
+    with open(log_path, "w") as log:
+        process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "backend.main:app", "--host", "127.0.0.1", "--port", str(port),
+             "--log-level", "warning"],
+            cwd=workdir, env=env, stdout=log, stderr=subprocess.STDOUT
+        )
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"API server exited with code {process.returncode}; see {log_path}")
+        try:
+            if httpx.get(base_url + "/", timeout=1).status_code == 200:
+                return process, base_url
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    process.kill()
+    raise RuntimeError("API server did not start within 60 s")
+
+
+def build_request(scenario: str, i: int, corpus: Corpus, role_ids: list) -> dict:
+    name, content, text = corpus.documents[i % len(corpus.documents)]
+    if scenario == "roles":
+        return {"method": "GET", "url": "/roles"}
+    if scenario == "upload":
+        return {"method": "POST", "url": "/upload", "files": {"file": (name, content)}}
+    # A per-request suffix keeps every analysis a cache miss unless the run is about caching
+    if scenario == "analyze_multi":
+        return {"method": "POST", "url": "/analyze/multi", "json": {"resume_text": f"{text}\nRef {i}"}}
+    body = {"resume_text": f"{text}\nRef {i}", "role_id": role_ids[i % len(role_ids)]}
+    url = "/analyze?mode=fast" if scenario == "analyze_fast" else "/analyze"
+    return {"method": "POST", "url": url, "json": body}
+
+
+def parse_server_timing(header: str) -> dict:
+    """"tika;dur=2.8, llm;dur=250.1" -> {"tika": 2.8, "llm": 250.1}"""
+    durations = {}
+    for entry in header.split(","):
+        name, _, params = entry.strip().partition(";")
+        if params.startswith("dur="):
+            durations[name] = float(params[4:])
+    return durations
+
+
+def percentile(sorted_values: list, q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(int(round(q / 100 * (len(sorted_values) - 1))), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+async def drive(base_url: str, scenario: str, corpus: Corpus, role_ids: list, requests: int,
+                concurrency: int, warmup: int) -> dict:
+    latencies, errors = [], 0
+    stage_totals, stage_counts = {}, {}
+    semaphore = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=600, limits=limits) as client:
+        for i in range(warmup):
+            await client.request(**build_request(scenario, -1 - i, corpus, role_ids))
+
+        async def one(i):
+            nonlocal errors
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    response = await client.request(**build_request(scenario, i, corpus, role_ids))
+                    ok = response.status_code < 400
+                    for name, ms in parse_server_timing(response.headers.get("server-timing", "")).items():
+                        stage_totals[name] = stage_totals.get(name, 0.0) + ms
+                        stage_counts[name] = stage_counts.get(name, 0) + 1
+                except httpx.HTTPError:
+                    ok = False
+                latencies.append((time.perf_counter() - started) * 1000)
+                errors += not ok
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(requests)))
+        wall = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": requests,
+        "errors": errors,
+        "error_rate": round(errors / requests, 4),
+        "rps": round(requests / wall, 2),
+        "mean_ms": round(sum(latencies) / len(latencies), 2),
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "max_ms": round(latencies[-1], 2),
+        # Mean server-side milliseconds per stage (from Server-Timing), over requests that ran the stage
+        "server_stages_ms": {name: round(stage_totals[name] / stage_counts[name], 2) for name in stage_totals},
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """Human-readable regressions: slower p95, lower throughput or slower micro-benchmarks."""
+    regressions = []
+    for name, current in results.get("scenarios", {}).items():
+        base = baseline.get("scenarios", {}).get(name)
+        if not base:
+            continue
+        # 2 ms of slack so sub-millisecond endpoints do not flap on scheduler noise
+        if current["p95_ms"] > base["p95_ms"] * (1 + tolerance) + 2:
+            regressions.append(f"{name}: p95 {current['p95_ms']} ms vs baseline {base['p95_ms']} ms")
+        if current["rps"] < base["rps"] * (1 - tolerance):
+            regressions.append(f"{name}: {current['rps']} req/s vs baseline {base['rps']} req/s")
+        if current["error_rate"] > base["error_rate"] + 0.01:
+            regressions.append(f"{name}: error rate {current['error_rate']} vs baseline {base['error_rate']}")
+    for group in ("micro", "stages"):
+        for name, current in results.get(group, {}).items():
+            base = baseline.get(group, {}).get(name)
+            # Best round rather than median: it is the least sensitive to background load
+            if base and current["best_ms"] > base["best_ms"] * (1 + tolerance) + 0.05:
+                regressions.append(f"{group}.{name}: {current['best_ms']} ms vs baseline {base['best_ms']} ms")
+    return regressions
+
+
+def print_report(results: dict):
+    print(f"\nCorpus: {results['corpus']['documents']} documents, {results['corpus']['bytes'] // 1024} KiB")
+    print(f"{'scenario':<14}{'req/s':>9}{'p50':>10}{'p95':>10}{'p99':>10}{'errors':>8}{'peak RSS':>10}")
+    for name, s in results.get("scenarios", {}).items():
+        rss = f"{s['peak_rss_mb']} MB" if s.get("peak_rss_mb") is not None else "n/a"
+        print(f"{name:<14}{s['rps']:>9}{s['p50_ms']:>10}{s['p95_ms']:>10}{s['p99_ms']:>10}{s['errors']:>8}{rss:>10}")
+    for name, s in results.get("scenarios", {}).items():
+        if s.get("server_stages_ms"):
+            stages = ", ".join(f"{k} {v}" for k, v in s["server_stages_ms"].items())
+            print(f"  {name} server stages (ms): {stages}")
+    for group in ("stages", "micro"):
+        if results.get(group):
+            print(f"\n{group} (ms per call, median / best)")
+            for name, m in results[group].items():
+                print(f"  {name:<28}{m['median_ms']:>10}{m['best_ms']:>10}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="ATS backend benchmark")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help=f"comma-separated subset of {SCENARIOS}")
+    parser.add_argument("--requests", type=int, default=200, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--per-cell", type=int, default=4, help="resumes per size x format")
+    parser.add_argument("--tika-latency", type=float, default=0.02, help="seconds per fake Tika call")
+    parser.add_argument("--llm-latency", type=float, default=0.25, help="seconds per fake Ollama generation")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="fraction of fake upstream calls that fail")
+    parser.add_argument("--cache", action="store_true", help="keep the parse/analysis caches enabled")
+    parser.add_argument("--no-micro", action="store_true", help="skip micro-benchmarks and stage timings")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative slowdown before failing")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    args = parser.parse_args(argv)
+
+    scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {sorted(unknown)}")
+
+    from backend.roles import ROLES
+    corpus = Corpus(per_cell=args.per_cell)
+    results = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "args": {k: getattr(args, k) for k in COMPARABLE_ARGS},
+        },
+        "corpus": corpus.summary(),
+        "scenarios": {},
+    }
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    log_path = os.path.join(os.path.dirname(args.output) or ".", "server.log")
+    tika = FakeTika(corpus.texts_by_digest, latency=args.tika_latency, failure_rate=args.failure_rate).start()
+    ollama = FakeOllama(latency=args.llm_latency, failure_rate=args.failure_rate).start()
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            process, base_url = start_api(workdir, tika.url, ollama.url, args.cache, log_path)
+            try:
+                for scenario in scenarios:
+                    print(f"Running {scenario} ({args.requests} requests, concurrency {args.concurrency})...")
+                    with RSSSampler(process.pid) as sampler:
+                        stats = asyncio.run(drive(
+                            base_url, scenario, corpus, list(ROLES), args.requests, args.concurrency, args.warmup
+                        ))
+                    stats["peak_rss_mb"] = sampler.peak()
+                    results["scenarios"][scenario] = stats
+                results["server_peak_rss_mb"] = read_proc_status(process.pid, "VmHWM")
+            finally:
+                process.terminate()
+                process.wait(timeout=30)
+    finally:
+        tika.stop()
+        ollama.stop()
+    results["upstream_calls"] = {"tika": tika.requests, "ollama": ollama.requests}
+
+    if not args.no_micro:
+        results["stages"] = stage_timings(corpus)
+        results["micro"] = micro_benchmarks(corpus)
+
+    print_report(results)
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("No baseline yet; run with --save-baseline to create one.")
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if baseline.get("meta", {}).get("args") != results["meta"]["args"]:
+        print("Baseline was recorded with different parameters; skipping the regression check.")
+        return 0
+    machine = [k for k in COMPARABLE_MACHINE if baseline.get("meta", {}).get(k) != results["meta"][k]]
+    if machine:
+        print(f"Baseline was recorded on a different machine ({', '.join(machine)}); "
+              "re-record it here with --save-baseline. Skipping the regression check.")
+        return 0
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print(f"\nREGRESSIONS (tolerance {args.tolerance:.0%}):")
+        for line in regressions:
+            print(f"  - {line}")
+        return 1
+    print(f"\nNo regressions against the baseline (tolerance {args.tolerance:.0%}).")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
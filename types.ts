@@ -3,6 +3,12 @@ export interface Skill {
   category: string;
 }
 
+export interface KeywordMatch {
+  keyword: string;
+  count: number;
+  spans: [number, number][]; // [start, end) offsets into the resume text
+}
+
 export interface ResumeAnalysis {
   atsScore: number;
   bestRole: string;
@@ -19,7 +25,16 @@ export interface ResumeAnalysis {
   section_scores?: Record<string, number>;
   keyword_match_score?: number;
   final_ats_score?: number;
+  role_weighted_score?: number;
   report_file?: string;
+
+  // Deterministic keyword details
+  missing_keywords?: string[];
+  matched_keywords?: KeywordMatch[];
+  keyword_weighted_score?: number;
+  // True when the AI score was estimated without the LLM (fast mode / LLM unavailable)
+  estimated?: boolean;
+  features?: Record<string, number>;
 }
 
 export interface FileData {